@@ -1,11 +1,16 @@
 # app.py - FIXED ObjectId JSON serialization issue
 
 import os
+import threading
+import time
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from graphene import Schema
-from schema_pymongo import pymongo_schema as schema  # Use PyMongo schema
+from schema_pymongo import pymongo_schema as schema, get_movie_service  # Use PyMongo schema
 from llm_processor import LLMProcessor
+from document_cache import DocumentCache
+from query_cost import query_cost_rule, cost_extensions
+from persisted_queries import PersistedQueryStore, PERSISTED_QUERY_NOT_FOUND
 import json
 from bson import ObjectId
 from dotenv import load_dotenv
@@ -17,13 +22,84 @@ CORS(app)
 
 print("✅ Using PyMongo direct connection (bypassing MongoEngine)")
 
-# Initialize LLM processor
-try:
-    llm_processor = LLMProcessor(model_name=os.getenv('OLLAMA_MODEL', 'llama2'))
-    print("✅ LLM Processor initialized")
-except Exception as e:
-    print(f"⚠️  LLM Processor initialization warning: {e}")
-    llm_processor = LLMProcessor()  # Will use fallback mode
+# Parsed and validated documents, reused across requests (generated queries repeat a few shapes).
+# Documents over the cost/depth/alias budget (GRAPHQL_MAX_COST/_DEPTH/_ALIASES) fail validation.
+document_cache = DocumentCache(
+    schema.graphql_schema,
+    max_entries=int(os.getenv('GRAPHQL_DOCUMENT_CACHE_SIZE', '512')),
+    extra_rules=[query_cost_rule()],
+    analyze=cost_extensions
+)
+
+# Automatic persisted queries: clients send a sha256 hash instead of the query text
+persisted_queries = PersistedQueryStore(
+    document_cache,
+    max_entries=int(os.getenv('PERSISTED_QUERY_CACHE_SIZE', '1000')),
+    disk_path=os.getenv('PERSISTED_QUERIES_PATH') or None
+)
+
+# The LLM processor (Ollama probe, Mongo ping, catalog index) is built lazily:
+# in a background warm-up thread per worker, or by the first request that needs it
+_llm_processor = None
+_llm_processor_pid = None
+_llm_processor_lock = threading.Lock()
+
+_warmup_lock = threading.Lock()
+_warmup_state = {'pid': None, 'ready': False, 'error': None, 'started_at': None, 'finished_at': None}
+
+def get_llm_processor():
+    """The worker's LLMProcessor, created on first use"""
+    global _llm_processor, _llm_processor_pid
+    
+    if _llm_processor is not None and _llm_processor_pid == os.getpid():
+        return _llm_processor
+    
+    with _llm_processor_lock:
+        if _llm_processor is None or _llm_processor_pid != os.getpid():
+            _llm_processor = LLMProcessor(model_name=os.getenv('OLLAMA_MODEL', 'llama2'))
+            _llm_processor_pid = os.getpid()
+            print("✅ LLM Processor initialized")
+        return _llm_processor
+
+def _warm_up():
+    """Build the processor and movie service off the request path"""
+    try:
+        get_llm_processor()
+        get_movie_service()
+        _warmup_state['ready'] = True
+    except Exception as e:
+        _warmup_state['error'] = str(e)
+        print(f"⚠️  Warm-up failed: {e}")
+    finally:
+        _warmup_state['finished_at'] = time.time()
+
+def start_warmup():
+    """Start the warm-up thread once per process (forked workers start their own)"""
+    if _warmup_state['pid'] == os.getpid():
+        return
+    with _warmup_lock:
+        if _warmup_state['pid'] == os.getpid():
+            return
+        _warmup_state.update(pid=os.getpid(), ready=False, error=None,
+                             started_at=time.time(), finished_at=None)
+        threading.Thread(target=_warm_up, name='warmup', daemon=True).start()
+
+def readiness():
+    """Warm-up progress for /health and /ready"""
+    ready = _warmup_state['ready'] or (_llm_processor is not None and _llm_processor_pid == os.getpid())
+    return {
+        'ready': ready,
+        'warmup_error': _warmup_state['error'],
+        'warmup_seconds': round(_warmup_state['finished_at'] - _warmup_state['started_at'], 2)
+        if _warmup_state['finished_at'] and _warmup_state['started_at'] else None
+    }
+
+@app.before_request
+def ensure_warmup():
+    start_warmup()
+
+if os.getenv('WARMUP_ON_START', 'true').lower() == 'true':
+    start_warmup()
 
 def serialize_mongodb_result(obj):
     """
@@ -38,22 +114,46 @@ def serialize_mongodb_result(obj):
     else:
         return obj
 
+def execute_generated_graphql(query, variables=None):
+    """Execute a generated GraphQL operation with its variables against the PyMongo schema"""
+    result = document_cache.execute(query, variables=variables)
+    return {
+        'data': result.data,
+        'errors': [str(error) for error in result.errors] if result.errors else None
+    }
+
 @app.route('/graphql', methods=['POST'])
 def graphql_endpoint():
-    """Standard GraphQL endpoint using PyMongo schema"""
+    """Standard GraphQL endpoint using PyMongo schema (accepts APQ persistedQuery hashes)"""
     data = request.get_json()
     
     try:
-        result = schema.execute(
-            data.get('query'),
+        query = data.get('query')
+        persisted = (data.get('extensions') or {}).get('persistedQuery')
+        if persisted:
+            if persisted.get('version', 1) != 1:
+                return jsonify({'data': None, 'errors': ['Unsupported persisted query version']})
+            if query:
+                persisted_queries.register(query, persisted.get('sha256Hash'))
+            else:
+                query = persisted_queries.get(persisted.get('sha256Hash', ''))
+                if query is None:
+                    # The client retries with the full query text, which registers it
+                    return jsonify({'data': None, 'errors': [PERSISTED_QUERY_NOT_FOUND]})
+        
+        result = document_cache.execute(
+            query,
             variables=data.get('variables'),
-            context={'request': request}
+            context={'request': request},
+            operation_name=data.get('operationName')
         )
         
         response = {
             'data': result.data,
             'errors': [str(error) for error in result.errors] if result.errors else None
         }
+        if result.extensions:
+            response['extensions'] = result.extensions
         
         return jsonify(response)
     
@@ -70,19 +170,20 @@ def natural_language_graphql_endpoint():
         return jsonify({'error': 'No input provided'})
     
     # Convert natural language to GraphQL
-    llm_result = llm_processor.natural_language_to_graphql(user_input)
+    llm_result = get_llm_processor().natural_language_to_graphql(user_input)
     
     if not llm_result['success']:
         return jsonify({'error': llm_result['error']})
     
     # Execute the generated GraphQL query using PyMongo schema
     try:
-        result = schema.execute(llm_result['graphql_query'])
+        result = document_cache.execute(llm_result['graphql_query'], variables=llm_result['graphql_variables'])
         
         response = {
             'approach': 'GraphQL',
             'original_input': user_input,
             'generated_query': llm_result['graphql_query'],
+            'variables': llm_result['graphql_variables'],
             'data': result.data,
             'errors': [str(error) for error in result.errors] if result.errors else None
         }
@@ -111,7 +212,7 @@ def natural_language_mongodb_endpoint():
         return jsonify({'error': 'No input provided'})
     
     # Convert natural language to MongoDB query and execute
-    mongodb_result = llm_processor.natural_language_to_mongodb(user_input)
+    mongodb_result = get_llm_processor().natural_language_to_mongodb(user_input)
     print(f"mongodb_result", mongodb_result)
     
     if not mongodb_result['success']:
@@ -161,20 +262,11 @@ def natural_language_compare_endpoint():
     if not user_input:
         return jsonify({'error': 'No input provided'})
     
-    # Get comparison results
-    comparison_result = llm_processor.compare_graphql_vs_mongodb(user_input)
-    
-    # Execute GraphQL query if successful using PyMongo schema
-    if comparison_result['graphql_approach']['success']:
-        try:
-            graphql_result = schema.execute(comparison_result['graphql_approach']['graphql_query'])
-            comparison_result['graphql_approach']['execution_result'] = {
-                'data': graphql_result.data,
-                'errors': [str(error) for error in graphql_result.errors] if graphql_result.errors else None
-            }
-        except Exception as e:
-            comparison_result['graphql_approach']['execution_error'] = str(e)
-    
+    # Parse once, then run both approaches in parallel (GraphQL executed via PyMongo schema)
+    comparison_result = get_llm_processor().compare_graphql_vs_mongodb(
+        user_input, graphql_executor=execute_generated_graphql
+    )
+
     # FIXED: Serialize the comparison result to handle any ObjectIds
     serialized_comparison = serialize_mongodb_result(comparison_result)
     
@@ -191,7 +283,7 @@ def direct_mongodb_query():
     
     try:
         # Execute the MongoDB query using the processor
-        result = llm_processor._execute_mongodb_query(data)
+        result = get_llm_processor()._execute_mongodb_query(data)
         
         # FIXED: Serialize the result to handle any ObjectIds
         serialized_result = serialize_mongodb_result(result)
@@ -208,20 +300,36 @@ def direct_mongodb_query():
 
 @app.route('/health', methods=['GET'])
 def health_check():
+    status = readiness()
+    processor = _llm_processor if status['ready'] else None
     return jsonify({
-        'status': 'healthy',
+        'status': 'healthy' if status['ready'] else 'starting',
+        'readiness': status,
         'endpoints': {
             'graphql': '/graphql',
             'natural_language_graphql': '/natural-language-graphql',
             'natural_language_mongodb': '/natural-language-mongodb',
             'natural_language_compare': '/natural-language-compare',
-            'direct_mongodb': '/mongodb-query'
+            'direct_mongodb': '/mongodb-query',
+            'ready': '/ready'
         },
-        'llm_processor': type(llm_processor).__name__,
-        'mongodb_connected': llm_processor.db is not None,
-        'graphql_backend': 'PyMongo (MongoEngine bypass)'
+        'llm_processor': type(processor).__name__ if processor else None,
+        'mongodb_connected': processor.db is not None if processor else None,
+        'graphql_backend': 'PyMongo (MongoEngine bypass)',
+        'parse_cache': processor.parse_cache.stats() if processor else None,
+        'graphql_document_cache': document_cache.stats(),
+        'persisted_queries': persisted_queries.stats(),
+        'ollama_available': processor.ollama_available if processor else None,
+        'ollama_circuit': processor.ollama_breaker.stats() if processor else None,
+        'llm_dispatcher': processor.llm_dispatcher.stats() if processor else None
     })
 
+@app.route('/ready', methods=['GET'])
+def ready_check():
+    """Readiness probe: 200 once warm-up has finished, 503 while starting"""
+    status = readiness()
+    return jsonify(status), 200 if status['ready'] else 503
+
 @app.route('/sample-queries', methods=['GET'])
 def sample_queries():
     """Provide sample queries for testing both approaches"""
@@ -369,6 +477,7 @@ if __name__ == '__main__':
     print(f"⚖️  Compare both approaches: http://localhost:{port}/natural-language-compare")
     print(f"🔧 Direct MongoDB queries: http://localhost:{port}/mongodb-query")
     print(f"🏥 Health check: http://localhost:{port}/health")
+    print(f"🚦 Readiness: http://localhost:{port}/ready")
     print(f"📋 Sample queries: http://localhost:{port}/sample-queries")
     print(f"🎭 Demo page: http://localhost:{port}/demo")
     
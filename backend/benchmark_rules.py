@@ -0,0 +1,173 @@
+# benchmark_rules.py - Micro-benchmark for the rule-based fallback parser
+import re
+import sys
+import time
+
+from rule_engine import RuleEngine
+
+QUERY_CORPUS = [
+    'Show me all action movies',
+    'Find movies from 2010',
+    'Get movies with rating above 8.0',
+    'Show all genres',
+    'Create a new movie with title "Veerendra"',
+    'Count how many movies we have',
+    'What is the average movie rating?',
+    'movies with rating 8.1',
+    'show comedy films rated 7.5',
+    'list sci-fi movies from 2014 with rating over 8',
+    'find movies directed by Christopher Nolan',
+    'movies starring Leonardo DiCaprio',
+    'delete movie called "Deadpool"',
+    'remove film called Avatar',
+    'update movie Inception rating to 9.0',
+    'how many horror movies are there',
+    'show me the movie called The Dark Knight',
+    'drama movies with rating below 6',
+    'which thriller films have a 7.9 rating',
+    'show categories',
+    'highest rated adventure movies',
+    'movies that feel like a rainy sunday',
+    'action-packed films from 1999',
+    'starring Tom Hanks',
+    'who is the best filmmaker',
+    'underrated war-torn dramas rated 8',
+    'remake of a sci-fi classic',
+]
+
+
+# Misreads the rules can't express; the confidence score must send these to the LLM
+FAST_PATH_REGRESSIONS = [
+    'show action movies with rating above 7 not from 2010',
+    'show me movies like Inception',
+    'show movies from 2016 with rating above 8 except Split',
+    'show me the movies released after 2010',
+    'show me the movies from before 2000',
+    'show me movies from the last year',
+    'find the movies from 2010 and 2012',
+]
+
+
+def legacy_parse(text):
+    """The pre-engine parser: one re.search per pattern, recompiled lookups each call"""
+    text_lower = text.lower().strip()
+
+    operation = 'READ'
+    for op, pattern in [
+        ('DELETE', r'\b(delete|remove|drop|eliminate|destroy)\b'),
+        ('CREATE', r'\b(add|create|insert|new|make)\b'),
+        ('UPDATE', r'\b(update|modify|change|edit|set|alter)\b'),
+        ('COUNT', r'\b(count|how many|number of)\b'),
+        ('AGGREGATE', r'\b(average|mean|sum|total|max|min|highest|lowest)\b'),
+    ]:
+        if re.search(pattern, text_lower):
+            operation = op
+            break
+
+    entity = 'MOVIE'
+    for ent, pattern in [
+        ('MOVIE', r'\b(movie|movies|film|films)'),
+        ('GENRE', r'\b(genre|genres|category|categories)'),
+        ('DIRECTOR', r'\b(director|directors)'),
+        ('ACTOR', r'\b(actor|actors|star|stars)'),
+    ]:
+        if re.search(pattern, text_lower, re.IGNORECASE):
+            entity = ent
+            break
+
+    filters = {}
+    genre_match = re.search(r'\b(action|comedy|drama|thriller|horror|sci-fi|romance|fantasy|adventure|crime|documentary|animation|biography|history|mystery|war|western|musical|sport)\b', text, re.IGNORECASE)
+    if genre_match:
+        filters['genre'] = genre_match.group().title()
+    year_match = re.search(r'\b(19|20)\d{2}\b', text)
+    if year_match:
+        filters['year'] = int(year_match.group())
+    for pattern, operation_type in [
+        (r'rating\s*(?:is\s+)?(?:above|over|greater\s+than|>|>=)\s*(\d+\.?\d*)', 'above'),
+        (r'rating\s*(?:is\s+)?(?:below|under|less\s+than|<|<=)\s*(\d+\.?\d*)', 'below'),
+        (r'with\s+rating\s+(\d+\.?\d*)', 'exact'),
+        (r'rating\s+(?:is\s+|equals?\s+|=\s*)?(\d+\.?\d*)', 'exact'),
+        (r'rated\s+(\d+\.?\d*)', 'exact'),
+        (r'(?:^|\s)(\d+\.?\d*)\s+rating', 'exact'),
+        (r'rating:\s*(\d+\.?\d*)', 'exact'),
+    ]:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            if operation_type == 'exact':
+                filters['rating'] = float(match.group(1))
+            else:
+                filters['rating'] = {'operator': operation_type, 'value': float(match.group(1))}
+            break
+    for pattern in [
+        r'(?:called|named|titled|with name)\s+["\']([^"\']+)["\']',
+        r'(?:called|named|titled|with name)\s+([A-Za-z0-9\s]+?)(?:\s|$)',
+        r'movie\s+["\']([^"\']+)["\']',
+        r'film\s+["\']([^"\']+)["\']'
+    ]:
+        title_match = re.search(pattern, text, re.IGNORECASE)
+        if title_match:
+            filters['title'] = title_match.group(1).strip()
+            break
+    director_match = re.search(r'(?:directed\s+by|director\s*:?)\s+([A-Za-z\s]+?)(?:\s|$)', text, re.IGNORECASE)
+    if director_match:
+        filters['director'] = director_match.group(1).strip()
+    actor_match = re.search(r'(?:starring|actor\s*:?|stars?)\s+([A-Za-z\s]+?)(?:\s|$)', text, re.IGNORECASE)
+    if actor_match:
+        filters['actor'] = actor_match.group(1).strip()
+
+    return {'operation': operation, 'entity': entity, 'filters': filters}
+
+
+def time_parser(parse, corpus, rounds):
+    """Return the mean cost of one parse in microseconds"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for query in corpus:
+            parse(query)
+    elapsed = time.perf_counter() - start
+    return elapsed / (rounds * len(corpus)) * 1_000_000
+
+
+def check_fast_path(threshold=0.85):
+    """Return the regression queries the rule-based fast path would still answer"""
+    from llm_processor import LLMProcessor
+
+    failures = []
+    for query in FAST_PATH_REGRESSIONS:
+        scan = RuleEngine.scan(query)
+        parsed = {key: scan[key] for key in ['operation', 'entity', 'filters']}
+        confidence = LLMProcessor._rule_confidence(query, parsed, scan['operation_keywords'])
+        if confidence >= threshold:
+            failures.append(query)
+            print(f"⚠️  Fast path would answer {query!r} (confidence {confidence})")
+    print(f"Fast-path regressions:   {len(failures)}")
+    return failures
+
+
+def run_benchmark(rounds=2000):
+    print("⏱️  Rule parser micro-benchmark")
+    print("=" * 40)
+    print(f"Corpus: {len(QUERY_CORPUS)} queries x {rounds} rounds")
+
+    mismatches = 0
+    for query in QUERY_CORPUS:
+        legacy = legacy_parse(query)
+        engine = RuleEngine.scan(query)
+        engine = {key: engine[key] for key in ['operation', 'entity', 'filters']}
+        if legacy != engine:
+            mismatches += 1
+            print(f"⚠️  Mismatch for {query!r}:\n   legacy={legacy}\n   engine={engine}")
+
+    legacy_us = time_parser(legacy_parse, QUERY_CORPUS, rounds)
+    engine_us = time_parser(RuleEngine.scan, QUERY_CORPUS, rounds)
+
+    print(f"Legacy per-parse cost:   {legacy_us:8.2f} µs")
+    print(f"RuleEngine per-parse:    {engine_us:8.2f} µs")
+    print(f"Speedup:                 {legacy_us / engine_us:8.2f}x")
+    print(f"Result mismatches:       {mismatches}")
+    return mismatches == 0 and not check_fast_path()
+
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    sys.exit(0 if run_benchmark(rounds) else 1)
@@ -0,0 +1,117 @@
+# circuit_breaker.py - Fail fast while a dependency (Ollama) is down
+import threading
+import time
+from typing import Dict, Any, Optional
+
+
+class CircuitBreaker:
+    """Classic closed -> open -> half-open breaker.
+
+    closed:    calls go through; failure_threshold consecutive failures open it
+    open:      calls are rejected immediately until reset_timeout has passed
+    half_open: up to half_open_max_calls probe calls go through; a success
+               closes the breaker, a failure opens it again
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probes_in_flight = 0
+
+        self.total_failures = 0
+        self.total_rejected = 0
+        self.times_opened = 0
+        self.last_error: Optional[str] = None
+
+    def _maybe_half_open(self):
+        if self._state == self.OPEN and time.time() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probes_in_flight = 0
+
+    def _open(self):
+        if self._state != self.OPEN:
+            self.times_opened += 1
+            print(f"⚡ Circuit '{self.name}' opened after {self._failures} failure(s)")
+        self._state = self.OPEN
+        self._opened_at = time.time()
+        self._probes_in_flight = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def is_open(self) -> bool:
+        """True while calls would be rejected (does not use up a half-open probe)"""
+        return self.state == self.OPEN
+
+    def allow_request(self) -> bool:
+        """Whether a call may go through now; callers must then record its outcome"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+                self._probes_in_flight += 1
+                return True
+            self.total_rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                print(f"✅ Circuit '{self.name}' closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._probes_in_flight = 0
+
+    def record_failure(self, error: Optional[str] = None):
+        with self._lock:
+            self._failures += 1
+            self.total_failures += 1
+            self.last_error = error
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._open()
+
+    def trip(self, error: Optional[str] = None):
+        """Open immediately, e.g. when a health check finds the dependency down"""
+        with self._lock:
+            self.last_error = error
+            self._open()
+
+    def allow_probe(self):
+        """Let the next call through as a half-open probe, e.g. after a passing health check"""
+        with self._lock:
+            if self._state == self.OPEN:
+                self._state = self.HALF_OPEN
+                self._probes_in_flight = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Breaker state and counters for status endpoints"""
+        with self._lock:
+            self._maybe_half_open()
+            return {
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'opened_at': self._opened_at,
+                'failure_threshold': self.failure_threshold,
+                'reset_timeout': self.reset_timeout,
+                'times_opened': self.times_opened,
+                'total_failures': self.total_failures,
+                'total_rejected': self.total_rejected,
+                'last_error': self.last_error
+            }
@@ -0,0 +1,109 @@
+# dataloader.py - Per-request batching and caching for nested GraphQL resolvers
+from typing import Any, Callable, Dict, Hashable, Iterable, List
+
+
+class DataLoader:
+    """Collects keys and fetches them with one batch call instead of one call per key.
+
+    Execution is synchronous, so a nested resolver cannot wait for its
+    siblings to ask first. Instead it queues the keys of all sibling parents
+    (see siblings()) before loading its own key; the first load then fetches
+    the whole level in one batch and the rest are served from the cache.
+    """
+
+    def __init__(self, batch_load_fn: Callable[[List[Hashable]], Dict[Hashable, Any]],
+                 max_batch_size: int = 500):
+        self.batch_load_fn = batch_load_fn
+        self.max_batch_size = max_batch_size
+        self._cache: Dict[Hashable, Any] = {}
+        self._queue: List[Hashable] = []
+        self._queued = set()
+
+        self.batches = 0
+        self.keys_loaded = 0
+
+    def queue(self, keys: Iterable[Hashable]):
+        """Add keys to the next batch (already cached or queued keys are skipped)"""
+        for key in keys:
+            if key not in self._cache and key not in self._queued:
+                self._queued.add(key)
+                self._queue.append(key)
+
+    def prime(self, key: Hashable, value: Any):
+        """Cache a value that is already known"""
+        self._cache[key] = value
+
+    def load(self, key: Hashable, default: Any = None) -> Any:
+        """Value for key, fetching every queued key in the same batch if needed"""
+        if key not in self._cache:
+            self.queue([key])
+            self._dispatch()
+        value = self._cache.get(key)
+        return default if value is None else value
+
+    def load_many(self, keys: Iterable[Hashable], default: Any = None) -> List[Any]:
+        keys = list(keys)
+        self.queue(keys)
+        if self._queue:
+            self._dispatch()
+        return [default if self._cache.get(key) is None else self._cache[key] for key in keys]
+
+    def _dispatch(self):
+        queue, self._queue, self._queued = self._queue, [], set()
+        for start in range(0, len(queue), self.max_batch_size):
+            chunk = queue[start:start + self.max_batch_size]
+            results = self.batch_load_fn(chunk)
+            self.batches += 1
+            self.keys_loaded += len(chunk)
+            for key in chunk:
+                self._cache[key] = results.get(key)
+
+
+class LoaderRegistry:
+    """The DataLoaders of one request, created on first use by name"""
+
+    def __init__(self):
+        self._loaders: Dict[Hashable, DataLoader] = {}
+
+    def get(self, name: Hashable, batch_load_fn: Callable[[List[Hashable]], Dict[Hashable, Any]]) -> DataLoader:
+        loader = self._loaders.get(name)
+        if loader is None:
+            loader = self._loaders[name] = DataLoader(batch_load_fn)
+        return loader
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'loaders': len(self._loaders),
+            'batches': sum(loader.batches for loader in self._loaders.values()),
+            'keys_loaded': sum(loader.keys_loaded for loader in self._loaders.values())
+        }
+
+
+def share_batch(items: List[Any]) -> List[Any]:
+    """Let each item of a resolved list see its siblings (for DataLoader.queue)"""
+    for item in items:
+        item._batch = items
+    return items
+
+
+def siblings(item: Any) -> List[Any]:
+    """Items resolved in the same list as item (just item if it was resolved alone)"""
+    return getattr(item, '_batch', None) or [item]
+
+
+def request_loaders(info) -> LoaderRegistry:
+    """The LoaderRegistry stored in the request's context dict"""
+    context = info.context
+    if isinstance(context, dict):
+        registry = context.get('loaders')
+        if registry is None:
+            registry = context['loaders'] = LoaderRegistry()
+        return registry
+    if context is None:
+        # No per-request storage - batching still works within this resolver
+        return LoaderRegistry()
+    registry = getattr(context, 'loaders', None)
+    if registry is None:
+        registry = LoaderRegistry()
+        setattr(context, 'loaders', registry)
+    return registry
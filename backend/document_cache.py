@@ -0,0 +1,121 @@
+# document_cache.py - Parse/validate each GraphQL document once and reuse it
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable, List, Optional, Sequence, Tuple, Type
+
+from graphql import (
+    DocumentNode, ExecutionResult, GraphQLError, GraphQLSchema,
+    execute_sync, parse, specified_rules, validate
+)
+from graphql.validation import ASTValidationRule
+
+
+def document_key(query: str) -> str:
+    """sha256 hex digest of the query text"""
+    return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+
+class DocumentCache:
+    """Thread-safe LRU cache of parsed and validated DocumentNodes.
+
+    Lexing, parsing and validating a document costs more than executing it
+    for small result sets, and the generators only emit a handful of query
+    shapes. Documents that fail to parse or validate are not cached.
+
+    extra_rules run after the standard validation rules; analyze, when given,
+    is computed once per document and returned in the result's extensions.
+    """
+
+    def __init__(self, schema: GraphQLSchema, max_entries: int = 512,
+                 extra_rules: Sequence[Type[ASTValidationRule]] = (),
+                 analyze: Optional[Callable[[GraphQLSchema, DocumentNode], Dict[str, Any]]] = None):
+        self.schema = schema
+        self.max_entries = max_entries
+        self.rules = list(specified_rules) + list(extra_rules)
+        self.analyze = analyze
+        self._documents = OrderedDict()  # sha256 -> (DocumentNode, extensions)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalid = 0
+
+    def get(self, query: str) -> Tuple[Optional[DocumentNode], Optional[List[GraphQLError]]]:
+        """(document, None) for a valid query, else (None, errors)"""
+        document, _, errors = self._lookup(query)
+        return document, errors
+
+    def _lookup(self, query: str) -> Tuple[Optional[DocumentNode], Optional[Dict[str, Any]], Optional[List[GraphQLError]]]:
+        key = document_key(query)
+        with self._lock:
+            entry = self._documents.get(key)
+            if entry is not None:
+                self._documents.move_to_end(key)
+                self.hits += 1
+                return entry[0], entry[1], None
+            self.misses += 1
+
+        # Parse outside the lock; two threads racing on a new query both parse it once
+        try:
+            document = parse(query)
+        except GraphQLError as error:
+            with self._lock:
+                self.invalid += 1
+            return None, None, [error]
+
+        errors = validate(self.schema, document, self.rules)
+        if errors:
+            with self._lock:
+                self.invalid += 1
+            return None, None, errors
+
+        extensions = self.analyze(self.schema, document) if self.analyze else None
+        with self._lock:
+            self._documents[key] = (document, extensions)
+            self._documents.move_to_end(key)
+            while len(self._documents) > self.max_entries:
+                self._documents.popitem(last=False)
+                self.evictions += 1
+        return document, extensions, None
+
+    def execute(self, query: str, variables: Optional[Dict[str, Any]] = None,
+                context: Any = None, operation_name: Optional[str] = None) -> ExecutionResult:
+        """Execute query using the cached document (parsed and validated on first use)"""
+        if not query:
+            return ExecutionResult(data=None, errors=[GraphQLError('Must provide query string.')])
+
+        document, extensions, errors = self._lookup(query)
+        if errors:
+            return ExecutionResult(data=None, errors=errors)
+
+        result = execute_sync(
+            self.schema,
+            document,
+            variable_values=variables,
+            # A fresh dict per execution holds per-request state such as DataLoaders
+            context_value=context if context is not None else {},
+            operation_name=operation_name
+        )
+        if extensions:
+            result.extensions = dict(extensions)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size for status endpoints"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._documents),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalid': self.invalid,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
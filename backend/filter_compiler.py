@@ -0,0 +1,60 @@
+# filter_compiler.py - Index-friendly MongoDB conditions for text filters
+import re
+from typing import Dict, Any, Optional
+
+# Case-insensitive equality; must match the collation of the genre indexes
+CASE_INSENSITIVE = {'locale': 'en', 'strength': 2}
+
+# Parser filter name -> movies collection field
+TEXT_FIELDS = {
+    'title': 'title',
+    'genre': 'genres',
+    'director': 'directors',
+    'actor': 'actors'
+}
+
+
+class FilterCompiler:
+    """Turns title/genre/director/actor filters into conditions an index can serve.
+
+    In order of preference:
+      1. a canonical catalog value     -> exact equality
+      2. a genre in any case           -> equality under CASE_INSENSITIVE collation
+      3. a prefix of catalog names     -> $in over those names
+      4. no catalog available          -> anchored, escaped prefix regex
+      5. nothing in the catalog starts with the value -> the old substring regex
+    Only the last one forces a collection scan.
+    """
+
+    def __init__(self, catalog=None, max_expansion: int = 50):
+        self.catalog = catalog
+        self.max_expansion = max_expansion
+
+    def _is_canonical(self, kind: str, value: str) -> bool:
+        return self.catalog is not None and self.catalog.canonical(kind, value) == value
+
+    def text_condition(self, kind: str, value: Any) -> Any:
+        """Condition for the field of a title/genre/director/actor filter"""
+        if not isinstance(value, str):
+            return {'$in': list(value)} if isinstance(value, (list, tuple)) else value
+
+        value = value.strip()
+        if kind == 'genre' or self._is_canonical(kind, value):
+            return value
+
+        if self.catalog is None or not self.catalog.covers(kind):
+            return {'$regex': '^' + re.escape(value), '$options': 'i'}
+
+        names = self.catalog.names_with_prefix(kind, value, limit=self.max_expansion)
+        if names:
+            return names[0] if len(names) == 1 else {'$in': names}
+        if names is None:
+            return {'$regex': '^' + re.escape(value), '$options': 'i'}
+        return {'$regex': re.escape(value), '$options': 'i'}
+
+    def collation_for(self, filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Collation the compiled filter needs, if any"""
+        genre = filters.get('genre') if isinstance(filters, dict) else None
+        if isinstance(genre, str) and not self._is_canonical('genre', genre.strip()):
+            return dict(CASE_INSENSITIVE)
+        return None
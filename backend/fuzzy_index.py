@@ -0,0 +1,172 @@
+# fuzzy_index.py - Trigram index for misspelled title and person lookups
+import bisect
+import re
+import threading
+from collections import Counter
+from itertools import islice
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from gazetteer import name_tokens
+
+# Sequel/part markers: a title differing in one of these is a different record
+ROMAN_NUMERAL = re.compile(r'x{0,3}(?:ix|iv|v?i{0,3})')
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase and strip punctuation so 'Spider-Man:' and 'spider man' compare equal"""
+    return ' '.join(name_tokens(name.replace('-', ' ')))
+
+
+def numeral_tokens(key: str) -> List[str]:
+    """Digit and roman-numeral tokens of a normalized key, in order"""
+    return [token for token in key.split() if token.isdigit() or ROMAN_NUMERAL.fullmatch(token)]
+
+
+def trigrams(key: str) -> List[str]:
+    """Padded character trigrams of a normalized key"""
+    padded = f"  {key} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def bounded_levenshtein(a: str, b: str, max_distance: int) -> Optional[int]:
+    """Edit distance between a and b, or None as soon as it must exceed max_distance"""
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if min(current) > max_distance:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= max_distance else None
+
+
+class FuzzyIndex:
+    """Per-kind trigram postings over canonical names.
+
+    lookup() gathers candidates sharing enough trigrams with the query (an
+    edit touches at most three trigrams), then verifies them with a bounded
+    edit distance, so a misspelling resolves in well under a millisecond
+    without scanning every name.
+    """
+
+    def __init__(self, max_distance: int = 2):
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        self._kinds = {}
+
+    @staticmethod
+    def _new_kind() -> Dict[str, Any]:
+        return {'names': [], 'keys': [], 'exact': {}, 'postings': {}, 'sorted': None}
+
+    @staticmethod
+    def _insert(table: Dict[str, Any], name: str):
+        key = normalize_name(name)
+        if not key or key in table['exact']:
+            return
+        entry_id = len(table['names'])
+        table['names'].append(name)
+        table['keys'].append(key)
+        table['exact'][key] = name
+        table['sorted'] = None
+        for gram in set(trigrams(key)):
+            table['postings'].setdefault(gram, []).append(entry_id)
+
+    def build(self, entries: Iterable[Tuple[str, str]]):
+        """Replace the index with (kind, name) entries"""
+        kinds = {}
+        for kind, name in entries:
+            if isinstance(name, str) and name.strip():
+                self._insert(kinds.setdefault(kind, self._new_kind()), name.strip())
+        with self._lock:
+            self._kinds = kinds
+
+    def add(self, kind: str, name: str):
+        """Incrementally add one name"""
+        if isinstance(name, str) and name.strip():
+            with self._lock:
+                self._insert(self._kinds.setdefault(kind, self._new_kind()), name.strip())
+
+    def canonical(self, kind: str, value: str) -> Optional[str]:
+        """Canonical spelling of value if it is a known name (ignoring case/punctuation)"""
+        table = self._kinds.get(kind)
+        if table is None or not isinstance(value, str):
+            return None
+        return table['exact'].get(normalize_name(value))
+
+    def names_with_prefix(self, kind: str, value: str, limit: int = 50) -> Optional[List[str]]:
+        """Canonical names starting with value, or None if there are more than limit"""
+        table = self._kinds.get(kind)
+        if table is None or not isinstance(value, str):
+            return []
+        prefix = normalize_name(value)
+        if not prefix:
+            return []
+
+        ordered = table['sorted']
+        if ordered is None:
+            with self._lock:
+                ordered = sorted(zip(table['keys'], table['names']))
+                table['sorted'] = ordered
+
+        names = []
+        for key, name in islice(ordered, bisect.bisect_left(ordered, (prefix,)), None):
+            if not key.startswith(prefix):
+                break
+            if len(names) == limit:
+                return None
+            names.append(name)
+        return names
+
+    def lookup(self, kind: str, value: str, limit: int = 3) -> List[Dict[str, Any]]:
+        """Closest canonical names to value, best first, within the allowed edit distance"""
+        table = self._kinds.get(kind)
+        if table is None or not isinstance(value, str):
+            return []
+        key = normalize_name(value)
+        if not key:
+            return []
+
+        exact = table['exact'].get(key)
+        if exact is not None:
+            return [{'value': exact, 'distance': 0}]
+
+        # Very short names must match exactly ('Cats' is not a typo for 'Cars')
+        if len(key) <= 4:
+            return []
+        allowed = 1 if len(key) <= 8 else self.max_distance
+        query_grams = set(trigrams(key))
+        needed = max(1, len(query_grams) - 3 * allowed)
+
+        shared = Counter()
+        postings = table['postings']
+        for gram in query_grams:
+            shared.update(postings.get(gram, ()))
+
+        # 'Kung Fu Panda 2' is one edit from 'Kung Fu Panda 3' but never a typo for it
+        numerals = numeral_tokens(key)
+        matches = []
+        for entry_id, count in shared.items():
+            if count < needed:
+                continue
+            candidate = table['keys'][entry_id]
+            distance = bounded_levenshtein(key, candidate, allowed)
+            if distance is not None and numeral_tokens(candidate) == numerals:
+                matches.append((distance, -count, table['names'][entry_id]))
+
+        matches.sort()
+        return [{'value': name, 'distance': distance} for distance, _, name in matches[:limit]]
+
+    def covers(self, kind: str) -> bool:
+        """True once any name of this kind has been indexed"""
+        return kind in self._kinds
+
+    def stats(self) -> Dict[str, Any]:
+        """Names indexed per kind"""
+        return {kind: len(table['names']) for kind, table in self._kinds.items()}
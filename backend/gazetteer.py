@@ -0,0 +1,153 @@
+# gazetteer.py - Token trie of catalog names for linear-time entity extraction
+import re
+import threading
+import time
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+NAME_TOKEN = re.compile(r"\w+(?:[-'·]\w+)*")
+
+# Kinds recognised in free text, in the order they are preferred when a
+# name belongs to several (e.g. someone who both directs and acts)
+ENTITY_KINDS = ['genre', 'director', 'actor', 'title']
+
+_TERMINAL = ''  # never produced by NAME_TOKEN, so safe as the end-of-name key
+
+
+def name_tokens(text: str) -> List[str]:
+    """Lowercased word tokens used as trie keys"""
+    return [token.lower() for token in NAME_TOKEN.findall(text)]
+
+
+class Gazetteer:
+    """Token trie over titles, director and actor names and genre names.
+
+    find_mentions() walks the input once, taking the longest catalog name
+    starting at each token, so extraction is O(input length x longest name)
+    regardless of catalog size. The trie is rebuilt off to the side and
+    swapped in, so readers never see a half-built index.
+    """
+
+    def __init__(self, ignore_words: Iterable[str] = ()):
+        self.ignore_words = frozenset(word.lower() for word in ignore_words)
+        self._root = {}
+        self._max_tokens = 0
+        self._lock = threading.Lock()
+        self.entry_count = 0
+        self.built_at = None
+        self.stale = False
+
+    def _accepts(self, kind: str, tokens: List[str]) -> bool:
+        """Skip single-word names that are numbers or everyday query words"""
+        if not tokens:
+            return False
+        if len(tokens) == 1 and kind != 'genre':
+            token = tokens[0]
+            return not token.isdigit() and token not in self.ignore_words and len(token) > 1
+        return True
+
+    def _insert(self, root: Dict, kind: str, name: str) -> int:
+        tokens = name_tokens(name)
+        if not self._accepts(kind, tokens):
+            return 0
+        node = root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        terminal = node.setdefault(_TERMINAL, {})
+        if kind in terminal:
+            return 0
+        terminal[kind] = name
+        return len(tokens)
+
+    def build(self, entries: Iterable[Tuple[str, str]]):
+        """Replace the index with (kind, name) entries"""
+        root = {}
+        max_tokens = 0
+        count = 0
+        for kind, name in entries:
+            if not isinstance(name, str) or not name.strip():
+                continue
+            length = self._insert(root, kind, name.strip())
+            if length:
+                count += 1
+                max_tokens = max(max_tokens, length)
+
+        with self._lock:
+            self._root = root
+            self._max_tokens = max_tokens
+            self.entry_count = count
+            self.built_at = time.time()
+
+    def add(self, kind: str, name: str):
+        """Incrementally add one name (e.g. after an insert)"""
+        if not isinstance(name, str) or not name.strip():
+            return
+        with self._lock:
+            length = self._insert(self._root, kind, name.strip())
+            if length:
+                self.entry_count += 1
+                self._max_tokens = max(self._max_tokens, length)
+
+    def invalidate(self):
+        """Mark the index for a rebuild (e.g. after an update or delete).
+
+        Only the rebuilder clears the flag, before it starts reading the
+        catalog, so a write that lands during a rebuild triggers another one.
+        """
+        self.stale = True
+
+    def find_mentions(self, text: str) -> List[Dict[str, Any]]:
+        """Return non-overlapping catalog names in text, longest match first"""
+        root = self._root
+        if not root:
+            return []
+
+        tokens = list(NAME_TOKEN.finditer(text))
+        lowered = [token.group().lower() for token in tokens]
+        mentions = []
+        i = 0
+        while i < len(tokens):
+            node = root
+            match: Optional[Tuple[int, Dict[str, str]]] = None
+            j = i
+            while j < len(tokens) and j - i < self._max_tokens:
+                node = node.get(lowered[j])
+                if node is None:
+                    break
+                if _TERMINAL in node:
+                    kinds = self._usable_kinds(node[_TERMINAL], tokens, i, j, text)
+                    if kinds:
+                        match = (j, kinds)
+                j += 1
+
+            if match is None:
+                i += 1
+                continue
+
+            end, kinds = match
+            mentions.append({
+                'kinds': kinds,
+                'text': text[tokens[i].start():tokens[end].end()],
+                'start': tokens[i].start(),
+                'end': tokens[end].end()
+            })
+            i = end + 1
+
+        return mentions
+
+    @staticmethod
+    def _usable_kinds(kinds: Dict[str, str], tokens, i: int, j: int, text: str) -> Dict[str, str]:
+        """Single-word titles and names only count when written exactly as catalogued"""
+        if i != j:
+            return kinds
+        written = text[tokens[i].start():tokens[i].end()]
+        return {kind: name for kind, name in kinds.items()
+                if kind == 'genre' or written == name}
+
+    def stats(self) -> Dict[str, Any]:
+        """Index size and freshness for status endpoints"""
+        return {
+            'entries': self.entry_count,
+            'max_name_tokens': self._max_tokens,
+            'built_at': self.built_at,
+            'stale': self.stale
+        }
@@ -0,0 +1,98 @@
+# graphql_operations.py - Fixed GraphQL operations the NL generators fill with variables
+
+MOVIE_FIELDS = '''
+    title
+    year
+    rating
+    genres
+    directors'''
+
+# document_id -> operation text; user values only ever travel as variables,
+# so each text is parsed and validated once no matter what users ask for
+OPERATIONS = {
+    'AllMovies': f'''
+query AllMovies {{
+  allMoviesList {{{MOVIE_FIELDS}
+  }}
+}}
+''',
+    'MovieByTitle': f'''
+query MovieByTitle($title: String!) {{
+  movieByTitle(title: $title) {{{MOVIE_FIELDS}
+  }}
+}}
+''',
+    'MoviesByGenre': f'''
+query MoviesByGenre($genre: String!) {{
+  moviesByGenre(genre: $genre) {{{MOVIE_FIELDS}
+    runtime
+  }}
+}}
+''',
+    'MoviesByYear': f'''
+query MoviesByYear($year: Int!) {{
+  moviesByYear(year: $year) {{{MOVIE_FIELDS}
+  }}
+}}
+''',
+    'MoviesByRating': f'''
+query MoviesByRating($minRating: Float!) {{
+  moviesByRating(minRating: $minRating) {{{MOVIE_FIELDS}
+  }}
+}}
+''',
+    'AllGenres': '''
+query AllGenres {
+  allGenresList(first: 100) {
+    name
+    description
+  }
+}
+''',
+    'DeleteMovieByTitle': '''
+mutation DeleteMovieByTitle($title: String!) {
+  deleteMovieByTitle(title: $title) {
+    result {
+      success
+      message
+    }
+  }
+}
+''',
+    'DeleteGenreByName': '''
+mutation DeleteGenreByName($name: String!) {
+  deleteGenreByName(name: $name) {
+    result {
+      success
+      message
+    }
+  }
+}
+''',
+    'CreateMovie': f'''
+mutation CreateMovie($title: String!, $year: Int, $rating: Float, $genres: [String], $directors: [String]) {{
+  createMovie(title: $title, year: $year, rating: $rating, genres: $genres, directors: $directors) {{
+    movie {{{MOVIE_FIELDS}
+    }}
+  }}
+}}
+''',
+    'CreateGenre': '''
+mutation CreateGenre($name: String!, $description: String) {
+  createGenre(name: $name, description: $description) {
+    genre {
+      name
+      description
+    }
+  }
+}
+''',
+    'UpdateMovieByTitle': f'''
+mutation UpdateMovieByTitle($title: String!, $newTitle: String, $year: Int, $rating: Float, $genres: [String]) {{
+  updateMovieByTitle(title: $title, newTitle: $newTitle, year: $year, rating: $rating, genres: $genres) {{
+    movie {{{MOVIE_FIELDS}
+    }}
+  }}
+}}
+''',
+}
@@ -0,0 +1,191 @@
+# index_manager.py - Declares, creates and audits the MongoDB indexes the query layer relies on
+import os
+import sys
+from typing import Dict, Any, List, Optional
+
+from dotenv import load_dotenv
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+from filter_compiler import CASE_INSENSITIVE
+from mongo_connection import get_database
+
+load_dotenv()
+
+# collection -> [(name, keys, options)]
+# Field names follow models.Movie / models.Genre, i.e. what the filters use.
+REQUIRED_INDEXES = {
+    'movies': [
+        # Exact and $in title lookups from the filter compiler
+        ('title_1', [('title', ASCENDING)], {}),
+        ('title_ci', [('title', ASCENDING)], {'collation': CASE_INSENSITIVE}),
+        # Genre filter in keyset-page order (pagination.ORDERS['rating'] ends in _id),
+        # so every page is read straight from the index; the collated twin serves
+        # case-insensitive genre equality
+        ('genres_1_rating_-1__id_-1',
+         [('genres', ASCENDING), ('rating', DESCENDING), ('_id', DESCENDING)], {}),
+        ('genres_ci_rating_-1__id_-1',
+         [('genres', ASCENDING), ('rating', DESCENDING), ('_id', DESCENDING)], {'collation': CASE_INSENSITIVE}),
+        # Multikey people lookups
+        ('directors_1', [('directors', ASCENDING)], {}),
+        ('actors_1', [('actors', ASCENDING)], {}),
+        # Year filter ordered by rating (generated MongoDB queries)
+        ('year_1_rating_-1', [('year', ASCENDING), ('rating', DESCENDING)], {}),
+        # Keyset orders 'year' and 'rating', and rating ranges / top-rated lists
+        ('year_1__id_1', [('year', ASCENDING), ('_id', ASCENDING)], {}),
+        ('rating_-1__id_-1', [('rating', DESCENDING), ('_id', DESCENDING)], {}),
+    ],
+    'genres': [
+        ('name_1', [('name', ASCENDING)], {'unique': True}),
+    ],
+}
+
+
+def _collation_key(collation: Optional[Dict[str, Any]]):
+    """The parts of a collation that decide whether two indexes are equivalent"""
+    if not collation:
+        return None
+    return (collation.get('locale'), collation.get('strength', 3))
+
+
+def _signature(keys, options: Dict[str, Any]):
+    """Comparable (keys, unique, collation) tuple for a declared or existing index"""
+    return (
+        tuple((field, int(direction) if isinstance(direction, (int, float)) else direction)
+              for field, direction in keys),
+        bool(options.get('unique', False)),
+        _collation_key(options.get('collation'))
+    )
+
+
+def _clashes(a, b) -> bool:
+    """MongoDB refuses two indexes with the same keys and collation but different options"""
+    return a[0] == b[0] and a[2] == b[2]
+
+
+def _existing_indexes(collection) -> Dict[str, Any]:
+    """Existing indexes of a collection as name -> signature"""
+    return {
+        name: _signature(info['key'], info)
+        for name, info in collection.index_information().items()
+    }
+
+
+def plan_indexes(db) -> Dict[str, List[Dict[str, Any]]]:
+    """Compare REQUIRED_INDEXES with the database without changing anything"""
+    plan = {}
+    for collection_name, specs in REQUIRED_INDEXES.items():
+        existing = _existing_indexes(db[collection_name])
+        by_signature = {signature: name for name, signature in existing.items()}
+        steps = []
+        for name, keys, options in specs:
+            signature = _signature(keys, options)
+            if existing.get(name) == signature:
+                status = 'ok'
+            elif signature in by_signature:
+                # Same index already there under another name
+                status = 'equivalent'
+                name = by_signature[signature]
+            elif name in existing or any(_clashes(signature, sig) for sig in existing.values()):
+                # Same name or same keys with different options: cannot be created alongside
+                status = 'conflict'
+            else:
+                status = 'missing'
+            steps.append({'name': name, 'keys': keys, 'options': options, 'status': status})
+        plan[collection_name] = steps
+    return plan
+
+
+def ensure_indexes(db, fix_conflicts: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+    """Create missing indexes; safe to run on every startup.
+
+    Conflicting indexes (e.g. a non-unique genres.name left by an old import)
+    are only dropped and rebuilt when fix_conflicts is set.
+    """
+    plan = plan_indexes(db)
+    for collection_name, steps in plan.items():
+        collection = db[collection_name]
+        existing = _existing_indexes(collection)
+        for step in steps:
+            if step['status'] == 'conflict':
+                if not fix_conflicts:
+                    print(f"⚠️  Index conflict on {collection_name}.{step['name']} - rerun with --fix to rebuild")
+                    continue
+                target = _signature(step['keys'], step['options'])
+                for name, signature in existing.items():
+                    if name == step['name'] or _clashes(target, signature):
+                        print(f"🗑️  Dropping conflicting index {collection_name}.{name}")
+                        collection.drop_index(name)
+            elif step['status'] != 'missing':
+                continue
+
+            try:
+                collection.create_index(step['keys'], name=step['name'], **step['options'])
+                step['status'] = 'created'
+                print(f"✅ Created index {collection_name}.{step['name']}")
+            except OperationFailure as e:
+                step['status'] = 'failed'
+                step['error'] = str(e)
+                print(f"❌ Could not create index {collection_name}.{step['name']}: {e}")
+    return plan
+
+
+def index_usage(db, collection_name: str) -> Dict[str, Any]:
+    """Per-index access counts from $indexStats (name -> {'ops', 'since'})"""
+    usage = {}
+    for stat in db[collection_name].aggregate([{'$indexStats': {}}]):
+        usage[stat['name']] = {
+            'ops': stat.get('accesses', {}).get('ops', 0),
+            'since': stat.get('accesses', {}).get('since')
+        }
+    return usage
+
+
+def index_report(db) -> Dict[str, Any]:
+    """Missing required indexes plus unused and undeclared ones, per collection"""
+    report = {}
+    for collection_name, steps in plan_indexes(db).items():
+        declared = {step['name'] for step in steps}
+        entry = {
+            'missing': [step['name'] for step in steps if step['status'] in ['missing', 'conflict']],
+            'extra': [name for name in _existing_indexes(db[collection_name])
+                      if name != '_id_' and name not in declared],
+            'unused': [],
+            'usage': {}
+        }
+        try:
+            entry['usage'] = index_usage(db, collection_name)
+            entry['unused'] = [name for name, stat in entry['usage'].items()
+                               if name != '_id_' and stat['ops'] == 0]
+        except OperationFailure as e:
+            entry['usage_error'] = str(e)
+        report[collection_name] = entry
+    return report
+
+
+def print_report(report: Dict[str, Any]):
+    for collection_name, entry in report.items():
+        print(f"\n📚 {collection_name}")
+        print(f"   Missing: {', '.join(entry['missing']) or 'none'}")
+        print(f"   Undeclared: {', '.join(entry['extra']) or 'none'}")
+        if 'usage_error' in entry:
+            print(f"   Usage stats unavailable: {entry['usage_error']}")
+        else:
+            print(f"   Unused since restart: {', '.join(entry['unused']) or 'none'}")
+            for name, stat in sorted(entry['usage'].items()):
+                print(f"     {name}: {stat['ops']} ops")
+
+
+if __name__ == "__main__":
+    print("🔍 MongoDB Index Manager")
+    print("=" * 40)
+
+    mongodb_uri = os.getenv('MONGODB_URI')
+    if not mongodb_uri:
+        print("❌ MONGODB_URI not found in environment variables")
+        sys.exit(1)
+
+    database = get_database(uri=mongodb_uri)
+    if '--report' not in sys.argv:
+        ensure_indexes(database, fix_conflicts='--fix' in sys.argv)
+    print_report(index_report(database))
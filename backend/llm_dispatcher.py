@@ -0,0 +1,157 @@
+# llm_dispatcher.py - Bounded concurrency and admission control for LLM calls
+import collections
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+
+class LLMDispatcher:
+    """Lets at most max_concurrent LLM calls run at once; the rest wait in a FIFO queue.
+
+    A single local model slows down for everyone when it runs several
+    generations at once, so extra callers queue instead. A caller is turned
+    away immediately (and should use its fallback) when the queue is full
+    or when the projected queue wait plus one call would exceed its budget.
+
+    Background calls (warm-up, keep-alive pings, prompt priming) take
+    low-priority slots: they never join the queue and only start when no user
+    call is waiting and a slot is free.
+    """
+
+    def __init__(self, max_concurrent: int = 1, max_queue: int = 16,
+                 expected_service_time: float = 3.0, history: int = 256):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+
+        self._condition = threading.Condition()
+        self._tickets = itertools.count()
+        self._waiting = collections.deque()
+        self._active = 0
+
+        # Moving average of call duration (see record_service_time), seeded until calls are measured
+        self._service_time = expected_service_time
+        self._wait_times = collections.deque(maxlen=history)
+
+        self.admitted = 0
+        self.rejected = {'queue_full': 0, 'over_budget': 0, 'timed_out': 0}
+        self.background_admitted = 0
+        self.background_skipped = 0
+        self.max_queue_depth_seen = 0
+
+    def projected_wait(self, queue_position: Optional[int] = None) -> float:
+        """Estimated seconds before a caller at queue_position (default: a new caller) gets a slot"""
+        with self._condition:
+            return self._projected_wait(queue_position)
+
+    def _projected_wait(self, queue_position: Optional[int] = None) -> float:
+        if queue_position is None:
+            queue_position = len(self._waiting)
+        if self._active + queue_position < self.max_concurrent:
+            return 0.0
+        # Each batch of max_concurrent callers ahead takes about one service time
+        ahead = self._active + queue_position - self.max_concurrent + 1
+        return self._service_time * ahead / self.max_concurrent
+
+    def _admit(self, budget: Optional[float]) -> Optional[str]:
+        """Wait for a slot; returns None once admitted or the rejection reason"""
+        start = time.time()
+        with self._condition:
+            if not self._waiting and self._active < self.max_concurrent:
+                self._active += 1
+                self.admitted += 1
+                self._wait_times.append(0.0)
+                return None
+
+            if len(self._waiting) >= self.max_queue:
+                self.rejected['queue_full'] += 1
+                return 'queue_full'
+            if budget is not None and self._projected_wait() + self._service_time > budget:
+                self.rejected['over_budget'] += 1
+                return 'over_budget'
+
+            ticket = next(self._tickets)
+            self._waiting.append(ticket)
+            self.max_queue_depth_seen = max(self.max_queue_depth_seen, len(self._waiting))
+            deadline = start + budget if budget is not None else None
+            try:
+                while self._waiting[0] != ticket or self._active >= self.max_concurrent:
+                    remaining = deadline - time.time() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        self.rejected['timed_out'] += 1
+                        return 'timed_out'
+                    self._condition.wait(remaining)
+            finally:
+                self._waiting.remove(ticket)
+                # The next ticket in line may be able to go now
+                self._condition.notify_all()
+
+            self._active += 1
+            self.admitted += 1
+            self._wait_times.append(time.time() - start)
+            return None
+
+    def _admit_background(self, budget: Optional[float]) -> Optional[str]:
+        """Wait until no user call is queued and a slot is free; None once admitted"""
+        deadline = time.time() + budget if budget is not None else None
+        with self._condition:
+            while self._waiting or self._active >= self.max_concurrent:
+                remaining = deadline - time.time() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    self.background_skipped += 1
+                    return 'timed_out'
+                self._condition.wait(remaining)
+            self._active += 1
+            self.background_admitted += 1
+            return None
+
+    def _release(self):
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def record_service_time(self, seconds: float):
+        """Feed the duration of a call that really reached the model into the wait estimate.
+
+        Only the caller knows whether it did: calls that bail out inside the
+        slot (e.g. circuit open) take ~0s and would drag the estimate down.
+        """
+        with self._condition:
+            self._service_time = 0.8 * self._service_time + 0.2 * seconds
+
+    @contextmanager
+    def slot(self, budget: Optional[float] = None, background: bool = False):
+        """Hold a call slot for the with-block; yields None if admitted, else the rejection reason.
+
+        budget is the time (seconds) the caller can spend waiting plus calling;
+        a background caller may spend all of it waiting for user calls to drain.
+        """
+        rejection = self._admit_background(budget) if background else self._admit(budget)
+        if rejection is not None:
+            yield rejection
+            return
+        try:
+            yield None
+        finally:
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, wait times and admission counters for status endpoints"""
+        with self._condition:
+            waits = sorted(self._wait_times)
+            return {
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'active': self._active,
+                'queue_depth': len(self._waiting),
+                'max_queue_depth_seen': self.max_queue_depth_seen,
+                'projected_wait': round(self._projected_wait(), 3),
+                'avg_service_time': round(self._service_time, 3),
+                'avg_wait_time': round(sum(waits) / len(waits), 3) if waits else 0.0,
+                'p95_wait_time': round(waits[int(0.95 * (len(waits) - 1))], 3) if waits else 0.0,
+                'admitted': self.admitted,
+                'rejected': dict(self.rejected),
+                'background_admitted': self.background_admitted,
+                'background_skipped': self.background_skipped
+            }
@@ -1365,20 +1365,201 @@
 # llm_processor.py - COMPLETE FIXED VERSION
 import re
 import json
-from typing import Dict, Any, List, Optional, Tuple
-from pymongo import MongoClient
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Callable
 from mongoengine import connect
 from models import Movie, Genre
 import os
 import requests
+import threading
 import time
+from query_cache import ParseCache
+from ollama_client import OllamaClient, JsonObjectScanner, ModelWarmth, parse_keep_alive, warm_up_model
+from rule_engine import RuleEngine
+from gazetteer import Gazetteer, ENTITY_KINDS
+from fuzzy_index import FuzzyIndex
+from filter_compiler import FilterCompiler, TEXT_FIELDS
+from index_manager import ensure_indexes
+from pagination import paginate
+from mongo_connection import get_client, get_database, pool_config
+from circuit_breaker import CircuitBreaker
+from llm_dispatcher import LLMDispatcher
+from single_flight import SingleFlight
+from graphql_operations import OPERATIONS
+
+# Words, decimals and comparison operators as typed (used to score rule-based parses)
+RAW_TOKEN_PATTERN = re.compile(r"\d+(?:\.\d+)?|[\w'-]+|[<>=]+")
 
 class LLMProcessor:
+    # Bump whenever PARSE_SYSTEM_PROMPT changes so cached parses are not reused
+    PROMPT_VERSION = "1"
+
+    PARSE_SYSTEM_PROMPT = """Parse movie database queries into JSON. Return only JSON.
+
+Schema: Movies(title, genres[], year, rating, directors[]), Genres(name)
+Operations: READ, CREATE, UPDATE, DELETE, COUNT, AGGREGATE
+
+IMPORTANT: Pay attention to operation keywords:
+- DELETE words: delete, remove, drop, eliminate, destroy
+- CREATE words: add, create, insert, new, make  
+- UPDATE words: update, modify, change, edit, set
+- READ words: show, get, find, list, search, display
+
+Return format:
+{"operation": "DELETE", "entity": "MOVIE", "filters": {"title": "Deadpool"}}
+
+Examples:
+"delete movie Deadpool" → {"operation": "DELETE", "entity": "MOVIE", "filters": {"title": "Deadpool"}}
+"remove film called Avatar" → {"operation": "DELETE", "entity": "MOVIE", "filters": {"title": "Avatar"}}
+"add movie Inception" → {"operation": "CREATE", "entity": "MOVIE", "data": {"title": "Inception"}}
+"update movie Inception rating to 9.0" → {"operation": "UPDATE", "entity": "MOVIE", "filters": {"title": "Inception"}, "updates": {"rating": 9.0}}
+"show action movies" → {"operation": "READ", "entity": "MOVIE", "filters": {"genre": "Action"}}
+"movies with rating 8.1" → {"operation": "READ", "entity": "MOVIE", "filters": {"rating": 8.1}}"""
+
+    # JSON schema passed as Ollama's `format` so the parse is always a valid object
+    PARSE_OUTPUT_SCHEMA = {
+        "type": "object",
+        "properties": {
+            "operation": {"type": "string", "enum": ["READ", "CREATE", "UPDATE", "DELETE", "COUNT", "AGGREGATE"]},
+            "entity": {"type": "string", "enum": ["MOVIE", "GENRE"]},
+            "filters": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "genre": {"type": "string"},
+                    "year": {"type": "integer"},
+                    "rating": {
+                        "anyOf": [
+                            {"type": "number"},
+                            {
+                                "type": "object",
+                                "properties": {
+                                    "operator": {"type": "string", "enum": ["above", "below", "equals"]},
+                                    "value": {"type": "number"}
+                                },
+                                "required": ["operator", "value"]
+                            }
+                        ]
+                    },
+                    "director": {"type": "string"},
+                    "actor": {"type": "string"}
+                }
+            },
+            "updates": {"type": "object"},
+            "data": {"type": "object"}
+        },
+        "required": ["operation", "entity"]
+    }
+
+    # Words the rule-based extractor fully understands; anything else in the
+    # input lowers the confidence of a rule-based parse
+    RULE_VOCABULARY = frozenset([
+        'show', 'get', 'find', 'list', 'search', 'display', 'what', 'which', 'tell', 'view', 'all',
+        'count', 'how', 'many', 'number', 'of', 'average', 'mean', 'sum', 'total',
+        'max', 'min', 'highest', 'lowest',
+        'movie', 'movies', 'film', 'films', 'genre', 'genres', 'category', 'categories',
+        'director', 'directors', 'actor', 'actors', 'star', 'stars',
+        'from', 'in', 'with', 'rating', 'ratings', 'rated', 'above', 'over', 'below', 'under',
+        'greater', 'less', 'is', 'are', 'equals', 'equal', 'released', 'year',
+        'by', 'directed', 'starring', 'called', 'named', 'titled', 'name',
+        'there', 'do', 'have', 'for', '>', '<', '>=', '<=', '='
+    ])
+
+    # Vocabulary words that only count as explained when the rules filled their slot
+    # ('from' with no year extracted means the rules missed what followed it)
+    SLOT_WORDS = {
+        'from': 'year', 'year': 'year', 'released': 'year',
+        'rated': 'rating', 'rating': 'rating', 'ratings': 'rating',
+        'above': 'rating', 'over': 'rating', 'below': 'rating', 'under': 'rating',
+        'greater': 'rating', 'less': 'rating',
+        'called': 'title', 'named': 'title', 'titled': 'title',
+        'directed': 'director', 'starring': 'actor'
+    }
+
+    # Everyday words that are never a one-word catalog mention ('Will', 'Up')
+    MENTION_IGNORE_WORDS = frozenset([
+        'a', 'an', 'the', 'me', 'us', 'my', 'please', 'kindly', 'just',
+        'all', 'some', 'any', 'can', 'could', 'would', 'will', 'you',
+        'i', 'we', 'want', 'like', 'give', 'let', 'see'
+    ])
+
+    # Articles and politeness that never change what a query asks for
+    NEUTRAL_WORDS = frozenset(['a', 'an', 'the', 'me', 'us', 'please'])
+    
+    # Negation, similarity, ranges and conjunctions change the meaning in ways the
+    # rules can't express (they would build the opposite filter, an exact year or
+    # keep only the first value) - always ask the LLM
+    LLM_ONLY_WORDS = frozenset([
+        'not', 'no', 'never', 'except', 'excluding', 'exclude', 'without', 'but',
+        'besides', 'other', 'like', 'similar', 'unlike', 'resembling',
+        'after', 'before', 'since', 'until', 'between', 'last', 'newest', 'oldest',
+        'and', 'or', 'than'
+    ])
+    
+    # Filter kinds resolved against the catalog with typo tolerance
+    FUZZY_KINDS = ('title', 'director', 'actor')
+    
+    # Only reads may be typo-corrected; a write must hit exactly the record it names
+    FUZZY_OPERATIONS = ('READ', 'COUNT', 'AGGREGATE')
+
     def __init__(self, model_name="llama2"):
         self.model_name = model_name
         self.ollama_base_url = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
         self.ollama_available = False
         
+        # Pooled keep-alive session shared by all threads using this processor
+        self.ollama = OllamaClient(self.ollama_base_url)
+        
+        # Stream tokens and stop generation at the first complete JSON object
+        self.stream_responses = os.getenv('OLLAMA_STREAM', 'true').lower() == 'true'
+        
+        # Chunks read past the JSON object hoping the stream ends (connection reuse)
+        # before closing it mid-generation (see _consume_ollama_stream)
+        self.stream_drain_chunks = int(os.getenv('OLLAMA_STREAM_DRAIN_CHUNKS', '3'))
+        
+        # Constrain parse output: 'schema' (PARSE_OUTPUT_SCHEMA), 'json' for Ollama < 0.5, or 'none'
+        self.output_format = os.getenv('OLLAMA_FORMAT', 'schema').lower()
+        
+        # Sent with every call so Ollama keeps the model loaded ('30m', '1h', '-1' = forever)
+        keep_alive = os.getenv('OLLAMA_KEEP_ALIVE', '30m')
+        self.keep_alive = int(keep_alive) if keep_alive.lstrip('-').isdigit() else keep_alive
+        keep_alive_seconds = parse_keep_alive(self.keep_alive)
+        
+        # Evaluate the system prompt once and send its context tokens instead of
+        # the full prompt on every call (re-primed when model or prompt version changes)
+        self.reuse_prompt_context = os.getenv('OLLAMA_REUSE_CONTEXT', 'true').lower() == 'true'
+        self._prompt_context = None
+        self._prompt_context_key = None
+        self._prompt_context_primed_at = None
+        self._prompt_context_failed_at = 0.0
+        self._prompt_context_lock = threading.Lock()
+        self.model_warmth = ModelWarmth(keep_alive_seconds, cold_load_ms=float(os.getenv('OLLAMA_COLD_LOAD_MS', '500')))
+        
+        # Idle time after which the health monitor pings the model to keep it resident
+        self.keep_alive_ping_interval = float(os.getenv(
+            'OLLAMA_KEEP_ALIVE_PING', str(keep_alive_seconds / 2 if keep_alive_seconds > 0 else float('inf'))
+        ))
+        
+        # Rule-based parses at or above this confidence skip the LLM entirely
+        self.rule_confidence_threshold = float(os.getenv('RULE_CONFIDENCE_THRESHOLD', '0.85'))
+        
+        # Fail fast to the rule-based parser while Ollama is down
+        self.ollama_breaker = CircuitBreaker(
+            'ollama',
+            failure_threshold=int(os.getenv('OLLAMA_BREAKER_FAILURES', '3')),
+            reset_timeout=float(os.getenv('OLLAMA_BREAKER_RESET', '30'))
+        )
+        
+        # Queue LLM calls beyond what the model can serve at once; callers whose
+        # budget the queue cannot meet get the rule-based parse straight away
+        self.llm_dispatcher = LLMDispatcher(
+            max_concurrent=int(os.getenv('OLLAMA_MAX_CONCURRENT', '1')),
+            max_queue=int(os.getenv('OLLAMA_MAX_QUEUE', '16')),
+            expected_service_time=float(os.getenv('OLLAMA_EXPECTED_SECONDS', '3'))
+        )
+        self.llm_request_budget = float(os.getenv('LLM_REQUEST_BUDGET', '20'))
+        
         # Test Ollama connection
         self._test_ollama_connection()
         
@@ -1395,10 +1576,11 @@ class LLMProcessor:
         
         if self.mongodb_uri:
             try:
-                self.mongo_client = MongoClient(self.mongodb_uri)
+                # Shared per-process client (see mongo_connection.py)
+                self.mongo_client = get_client(self.mongodb_uri)
                 # Test the connection
                 self.mongo_client.admin.command('ping')
-                self.db = self.mongo_client.imdb
+                self.db = get_database()
                 self.mongodb_connected = True
                 print("✅ Connected to MongoDB for direct queries")
             except Exception as e:
@@ -1407,28 +1589,163 @@ class LLMProcessor:
         else:
             print("⚠️  MongoDB URI not found - MongoDB queries will be simulated")
         
-        # FIXED: Improved operation patterns
-        self.operation_patterns = {
-            'DELETE': r'\b(delete|remove|drop|eliminate|destroy)\s+(movie|film|genre)',
-            'CREATE': r'\b(add|create|insert|new|make)\s+(movie|film|genre)',
-            'UPDATE': r'\b(update|modify|change|edit|set|alter)\s+(movie|film|genre)',
-            'READ': r'\b(show|get|find|list|search|display|what|which|tell me|view)',
-            'COUNT': r'\b(count|how many|number of)',
-            'AGGREGATE': r'\b(average|mean|sum|total|max|min|highest|lowest)'
-        }
+        # Create any missing indexes the generated filters rely on (idempotent)
+        if self.mongodb_connected and os.getenv('ENSURE_INDEXES', 'true').lower() == 'true':
+            try:
+                ensure_indexes(self.db)
+            except Exception as e:
+                print(f"⚠️  Index check failed: {e}")
+        
+        # Worker threads for running the GraphQL and MongoDB sides of a comparison in parallel
+        self._compare_pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv('COMPARE_WORKERS', '8')),
+            thread_name_prefix='compare'
+        )
+        
+        # Cache of validated LLM parses keyed on the normalized input
+        self.parse_cache = ParseCache(
+            max_entries=int(os.getenv('PARSE_CACHE_SIZE', '1024')),
+            ttl_seconds=float(os.getenv('PARSE_CACHE_TTL', '3600')),
+            disk_path=os.getenv('PARSE_CACHE_PATH') or None,
+            max_disk_entries=int(os.getenv('PARSE_CACHE_DISK_SIZE', '10000'))
+        )
+        
+        # Concurrent cache misses for the same input share one LLM call
+        self.parse_flight = SingleFlight()
+        
+        # Catalog names (titles, people, genres) recognised anywhere in the input
+        self.gazetteer = Gazetteer(ignore_words=self.RULE_VOCABULARY | self.MENTION_IGNORE_WORDS)
+        
+        # Trigram index resolving misspelled titles and people to catalog values
+        self.fuzzy_index = FuzzyIndex(max_distance=int(os.getenv('FUZZY_MAX_DISTANCE', '2')))
+        
+        # Index-friendly conditions for title/genre/director/actor filters
+        self.filter_compiler = FilterCompiler(self.fuzzy_index)
+        self._catalog_refresh_lock = threading.Lock()
+        self._catalog_refreshing = False
+        self.refresh_catalog_index()
+        
+        # Re-check Ollama in the background so outages and recoveries are noticed
+        self.health_check_interval = float(os.getenv('OLLAMA_HEALTH_INTERVAL', '15'))
+        self.last_health_check = None
+        self._stop_background = threading.Event()
+        if self.health_check_interval > 0:
+            threading.Thread(target=self._health_monitor_loop, name='ollama-health', daemon=True).start()
+        
+        # Load the model now rather than on the first user request
+        if self.ollama_available and os.getenv('OLLAMA_WARMUP', 'true').lower() == 'true':
+            threading.Thread(target=self.warm_up_model, name='ollama-warmup', daemon=True).start()
+    
+    def refresh_catalog_index(self) -> bool:
+        """(Re)build the in-memory catalog index from the movies and genres collections"""
+        if not self.mongodb_connected or self.db is None:
+            return False
         
-        # Entity patterns
-        self.entity_patterns = {
-            'MOVIE': r'\b(movie|movies|film|films)',
-            'GENRE': r'\b(genre|genres|category|categories)',
-            'DIRECTOR': r'\b(director|directors)',
-            'ACTOR': r'\b(actor|actors|star|stars)'
-        }
+        # Writes from here on mark the index stale again and get another rebuild
+        self.gazetteer.stale = False
+        try:
+            start_time = time.time()
+            entries = []
+            for movie in self.db.movies.find({}, {'_id': 0, 'title': 1, 'directors': 1, 'actors': 1, 'genres': 1}):
+                entries.extend(self._catalog_entries('movies', movie))
+            for genre in self.db.genres.find({}, {'_id': 0, 'name': 1}):
+                entries.extend(self._catalog_entries('genres', genre))
+            
+            self.gazetteer.build(entries)
+            self.fuzzy_index.build(entries)
+            print(f"✅ Catalog index built: {self.gazetteer.entry_count} names in {time.time() - start_time:.2f}s")
+            return True
+        except Exception as e:
+            print(f"⚠️  Catalog index build failed: {e}")
+            self.gazetteer.invalidate()
+            return False
+    
+    def _schedule_catalog_refresh(self):
+        """Rebuild a stale catalog index in one background thread; readers keep the old index until the swap"""
+        with self._catalog_refresh_lock:
+            if self._catalog_refreshing:
+                return
+            self._catalog_refreshing = True
+        
+        def rebuild():
+            try:
+                # Loop while writes keep landing; stop on failure and retry on a later parse
+                while self.gazetteer.stale and self.refresh_catalog_index():
+                    pass
+            finally:
+                with self._catalog_refresh_lock:
+                    self._catalog_refreshing = False
+        
+        threading.Thread(target=rebuild, name='catalog-refresh', daemon=True).start()
+    
+    def _catalog_entries(self, collection: str, document: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """(kind, name) pairs a movies or genres document contributes to the catalog index"""
+        if collection == 'genres':
+            return [('genre', document.get('name'))]
+        
+        entries = [('title', document.get('title'))]
+        for kind, field in [('director', 'directors'), ('actor', 'actors'), ('genre', 'genres')]:
+            names = document.get(field) or []
+            if isinstance(names, str):
+                names = [names]
+            entries.extend((kind, name) for name in names)
+        return entries
+    
+    def resolve_fuzzy(self, kind: str, value: str) -> Optional[str]:
+        """Canonical catalog spelling of a title/director/actor, tolerating small typos"""
+        matches = self.fuzzy_index.lookup(kind, value, limit=1)
+        return matches[0]['value'] if matches else None
+    
+    def _canonicalize_filters(self, parsed: Dict[str, Any], user_input: str = ''):
+        """Replace misspelled title/director/actor filters with their catalog values.
+        
+        DELETE and UPDATE only get exact (case/punctuation-insensitive) matches.
+        """
+        filters = parsed.get('filters')
+        operation = parsed.get('operation')
+        if not isinstance(filters, dict) or operation == 'CREATE':
+            return
+        resolve = self.resolve_fuzzy if operation in self.FUZZY_OPERATIONS else self.fuzzy_index.canonical
+        
+        for kind in self.FUZZY_KINDS:
+            value = filters.get(kind)
+            if isinstance(value, str) and value.strip():
+                canonical = resolve(kind, value)
+                if canonical is None:
+                    # The rules stop at the first word ("directed by Christoper");
+                    # retry with the words that follow it in the input
+                    position = user_input.lower().find(value.lower())
+                    following = user_input[position + len(value):].split()[:2] if position >= 0 else []
+                    for count in range(len(following), 0, -1):
+                        canonical = resolve(kind, ' '.join([value] + following[:count]))
+                        if canonical is not None:
+                            break
+                if canonical is not None and canonical != value:
+                    print(f"🔤 Resolved {kind} '{value}' -> '{canonical}'")
+                    filters[kind] = canonical
+    
+    def _apply_catalog_mentions(self, user_input: str, filters: Dict[str, Any]):
+        """Fill title/director/actor/genre filters from catalog names found in the input"""
+        if self.gazetteer.stale:
+            self._schedule_catalog_refresh()
+        
+        for mention in self.gazetteer.find_mentions(user_input):
+            kinds = mention['kinds']
+            
+            # A mention that completes a value the rules only partly captured
+            # ("called The" -> "The Dark Knight") keeps that value's kind
+            kind = next((k for k in ['title', 'director', 'actor']
+                         if k in kinds and isinstance(filters.get(k), str)
+                         and kinds[k].lower().startswith(filters[k].lower())), None)
+            if kind is None:
+                kind = next((k for k in ENTITY_KINDS if k in kinds and k not in filters), None)
+            if kind is not None:
+                filters[kind] = kinds[kind]
     
     def _test_ollama_connection(self):
         """Test if Ollama is running and accessible"""
         try:
-            response = requests.get(f"{self.ollama_base_url}/api/tags", timeout=5)
+            response = self.ollama.get('/api/tags', read_timeout=5)
             if response.status_code == 200:
                 # Check if our model is available
                 models = response.json().get('models', [])
@@ -1465,13 +1782,188 @@ class LLMProcessor:
             print(f"⚠️  Cannot connect to Ollama: {e}")
             print("Make sure Ollama is running: ollama serve")
     
-    def _call_ollama(self, prompt: str, system_prompt: str = None) -> Dict[str, Any]:
+    def _probe_ollama(self) -> bool:
+        """Cheap liveness check: /api/tags answers and lists at least one model"""
+        try:
+            response = self.ollama.get('/api/tags', read_timeout=float(os.getenv('OLLAMA_HEALTH_TIMEOUT', '2')))
+            return response.status_code == 200 and bool(response.json().get('models'))
+        except Exception:
+            return False
+    
+    def check_ollama_health(self) -> bool:
+        """Probe Ollama and update availability and the circuit breaker"""
+        healthy = self._probe_ollama()
+        self.last_health_check = time.time()
+        
+        if healthy:
+            if not self.ollama_available:
+                print("✅ Ollama is reachable again")
+                # Re-selects the model and sets ollama_available
+                self._test_ollama_connection()
+            self.ollama_breaker.allow_probe()
+        else:
+            if self.ollama_available:
+                print("⚠️  Ollama health check failed - using rule-based parsing")
+            self.ollama_available = False
+            self.ollama_breaker.trip('health check failed')
+        
+        return healthy
+    
+    def _health_monitor_loop(self):
+        while not self._stop_background.wait(self.health_check_interval):
+            if self.check_ollama_health() and self._keep_alive_ping_due():
+                self.warm_up_model()
+    
+    def _keep_alive_ping_due(self) -> bool:
+        """True when the model has been idle long enough that Ollama may unload it"""
+        idle = self.model_warmth.idle_seconds()
+        return idle is None or idle >= self.keep_alive_ping_interval
+    
+    def warm_up_model(self) -> Dict[str, Any]:
+        """Load the model into Ollama's memory ahead of real requests (also used as keep-alive ping).
+        
+        Runs in a low-priority dispatcher slot, so it never competes with user
+        calls; if they keep the model busy for a whole budget it is skipped -
+        the model is warm anyway.
+        """
+        with self.llm_dispatcher.slot(self.llm_request_budget, background=True) as rejection:
+            if rejection is not None:
+                print(f"⏭️  Model warm-up skipped - user requests are using the model ({rejection})")
+                return {
+                    'success': False,
+                    'error': f'LLM queue busy ({rejection})',
+                    'queue_rejected': rejection
+                }
+            
+            result = warm_up_model(self.ollama, self.model_name, self.keep_alive)
+            if result['success']:
+                self.model_warmth.record_warmup(result['elapsed_time'])
+                print(f"🔥 Model {self.model_name} warm ({result['elapsed_time']:.1f}s, load {result['load_ms']:.0f}ms)")
+                if self.reuse_prompt_context:
+                    # Primed in the same slot
+                    self._get_prompt_context(self.PARSE_SYSTEM_PROMPT)
+            else:
+                print(f"⚠️  Model warm-up failed: {result['error']}")
+            return result
+    
+    def _get_prompt_context(self, system_prompt: str) -> Optional[List[int]]:
+        """Context tokens for system_prompt, priming them on first use or after a model/prompt change.
+        
+        Priming is a generate call: callers must already hold a dispatcher slot.
+        """
+        key = (self.model_name, self.PROMPT_VERSION, hash(system_prompt))
+        if self._prompt_context_key == key:
+            return self._prompt_context
+        
+        # After a failed priming, send the full system prompt for a while instead of retrying every call
+        if time.time() - self._prompt_context_failed_at < 60:
+            return None
+        
+        with self._prompt_context_lock:
+            if self._prompt_context_key != key:
+                context = self._prime_prompt_context(system_prompt)
+                if context is None:
+                    self._prompt_context_failed_at = time.time()
+                    return None
+                self._prompt_context = context
+                self._prompt_context_key = key
+                self._prompt_context_primed_at = time.time()
+            return self._prompt_context
+    
+    def _prime_prompt_context(self, system_prompt: str) -> Optional[List[int]]:
+        """Have Ollama evaluate system_prompt once and return the resulting context tokens"""
+        payload = {
+            "model": self.model_name,
+            "system": system_prompt,
+            "prompt": "Reply OK.",
+            "stream": False,
+            "keep_alive": self.keep_alive,
+            "options": {
+                "temperature": 0.1,
+                "num_predict": 2
+            }
+        }
+        try:
+            start_time = time.time()
+            response = self.ollama.post('/api/generate', payload)
+            if response.status_code != 200:
+                print(f"⚠️  Prompt priming failed: Ollama API error {response.status_code}")
+                return None
+            context = response.json().get('context')
+            if not context:
+                return None
+            print(f"🧠 Primed system prompt ({len(context)} tokens, {time.time() - start_time:.1f}s)")
+            return context
+        except Exception as e:
+            print(f"⚠️  Prompt priming failed: {e}")
+            return None
+    
+    def prompt_context_status(self) -> Dict[str, Any]:
+        """Whether a primed system prompt context is in use"""
+        key = self._prompt_context_key
+        return {
+            'enabled': self.reuse_prompt_context,
+            'primed': key is not None and key[:2] == (self.model_name, self.PROMPT_VERSION),
+            'tokens': len(self._prompt_context) if self._prompt_context else 0,
+            'model': key[0] if key else None,
+            'prompt_version': key[1] if key else None,
+            'primed_at': self._prompt_context_primed_at
+        }
+    
+    def stop_background_tasks(self):
+        """Stop the health monitor thread"""
+        self._stop_background.set()
+    
+    def _parse_output_format(self) -> Any:
+        """Value for Ollama's `format` field on parse calls, or None"""
+        if self.output_format == 'schema':
+            return self.PARSE_OUTPUT_SCHEMA
+        if self.output_format == 'json':
+            return 'json'
+        return None
+    
+    def _call_ollama(self, prompt: str, system_prompt: str = None, output_format: Any = None,
+                     budget: Optional[float] = None) -> Dict[str, Any]:
+        """Call Ollama through the circuit breaker and dispatcher queue; rejected calls return immediately"""
+        circuit_open = {
+            'success': False,
+            'error': 'Ollama circuit open - skipping LLM call',
+            'circuit_open': True
+        }
+        # Don't queue at all during an outage (is_open() does not use up a half-open probe)
+        if self.ollama_breaker.is_open():
+            return circuit_open
+        
+        with self.llm_dispatcher.slot(budget if budget is not None else self.llm_request_budget) as rejection:
+            if rejection is not None:
+                return {
+                    'success': False,
+                    'error': f'LLM queue rejected the call ({rejection})',
+                    'queue_rejected': rejection
+                }
+            
+            # Taken only once admitted, so a rejected caller never holds the half-open probe
+            if not self.ollama_breaker.allow_request():
+                return circuit_open
+            
+            start = time.time()
+            result = self._request_ollama(prompt, system_prompt, output_format)
+            if result['success']:
+                # Failed calls (connection refused, errors) say nothing about generation time
+                self.llm_dispatcher.record_service_time(time.time() - start)
+                self.ollama_breaker.record_success()
+            else:
+                self.ollama_breaker.record_failure(result['error'])
+            return result
+    
+    def _request_ollama(self, prompt: str, system_prompt: str = None, output_format: Any = None) -> Dict[str, Any]:
         """Call Ollama API with error handling"""
         try:
             payload = {
                 "model": self.model_name,
                 "prompt": prompt,
-                "stream": False,
+                "stream": self.stream_responses,
+                "keep_alive": self.keep_alive,
                 "options": {
                     "temperature": 0.1,
                     "top_p": 0.9,
@@ -1479,31 +1971,55 @@ class LLMProcessor:
                 }
             }
             
+            if output_format:
+                payload["format"] = output_format
+            
             if system_prompt:
-                payload["system"] = system_prompt
+                context = self._get_prompt_context(system_prompt) if self.reuse_prompt_context else None
+                if context:
+                    # The system prompt is already evaluated inside these tokens
+                    payload["context"] = context
+                else:
+                    payload["system"] = system_prompt
             
             start_time = time.time()
             
-            response = requests.post(
-                f"{self.ollama_base_url}/api/generate",
-                json=payload,
-                timeout=25  # Shorter timeout for faster fallback
-            )
+            # Read timeout is kept short (OLLAMA_READ_TIMEOUT) for faster fallback
+            response = self.ollama.post('/api/generate', payload, stream=self.stream_responses)
+            
+            if response.status_code == 200 and self.stream_responses:
+                response_text, model, stopped_early, load_ms = self._consume_ollama_stream(response, start_time)
+                elapsed = time.time() - start_time
+                return {
+                    'success': True,
+                    'response': response_text,
+                    'model': model,
+                    'elapsed_time': elapsed,
+                    'stopped_early': stopped_early,
+                    'model_state': self.model_warmth.record_call(elapsed, load_ms)
+                }
             
             elapsed = time.time() - start_time
             
             if response.status_code == 200:
                 result = response.json()
+                load_ms = result['load_duration'] / 1e6 if 'load_duration' in result else None
                 return {
                     'success': True,
                     'response': result.get('response', ''),
                     'model': result.get('model', self.model_name),
-                    'elapsed_time': elapsed
+                    'elapsed_time': elapsed,
+                    'model_state': self.model_warmth.record_call(elapsed, load_ms)
                 }
             else:
+                try:
+                    # Read the short error body so a streamed response gives its pooled connection back
+                    detail = response.text.strip()[:200]
+                finally:
+                    response.close()
                 return {
                     'success': False,
-                    'error': f"Ollama API error: {response.status_code}"
+                    'error': f"Ollama API error: {response.status_code}" + (f" - {detail}" if detail else "")
                 }
                 
         except requests.exceptions.Timeout:
@@ -1517,34 +2033,109 @@ class LLMProcessor:
                 'error': f"Ollama call failed: {str(e)}"
             }
     
+    def _consume_ollama_stream(self, response, start_time: float) -> Tuple[str, str, bool, Optional[float]]:
+        """Read Ollama's NDJSON token stream until the first complete JSON object.
+
+        Once the object is complete, up to stream_drain_chunks more chunks are
+        read. With schema-constrained output the final 'done' chunk follows
+        right away, the stream is fully read, and the keep-alive connection
+        goes back to the pool. If the model keeps talking, the response is
+        closed mid-stream instead. That drops the pooled connection, but it is
+        the only way to make Ollama abort the rest of the generation, which
+        costs far more than one new connection.
+        Returns (response_text, model, stopped_early, load_ms).
+        """
+        scanner = JsonObjectScanner()
+        tokens = []
+        model = self.model_name
+        load_ms = None
+        json_text = None
+        drained = 0
+        
+        try:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if 'error' in chunk:
+                    raise RuntimeError(chunk['error'])
+                
+                model = chunk.get('model', model)
+                if chunk.get('done'):
+                    if 'load_duration' in chunk:
+                        load_ms = chunk['load_duration'] / 1e6
+                    # Keep iterating: the stream ends right after, and a fully
+                    # read response releases its connection to the pool
+                    continue
+                
+                if json_text is not None:
+                    drained += 1
+                    if drained > self.stream_drain_chunks:
+                        return json_text, model, True, load_ms
+                    continue
+                
+                token = chunk.get('response', '')
+                tokens.append(token)
+                json_text = scanner.feed(token)
+                if time.time() - start_time > self.ollama.read_timeout:
+                    raise requests.exceptions.Timeout("Ollama stream exceeded read timeout")
+        finally:
+            response.close()
+        
+        if json_text is not None:
+            return json_text, model, False, load_ms
+        return ''.join(tokens), model, False, load_ms
+    
     def parse_natural_language_with_llm(self, user_input: str) -> Dict[str, Any]:
+        """Parse natural language using Ollama LLM, served from the parse cache when possible"""
+        
+        cache_key = self.parse_cache.make_key(user_input, self.model_name, self.PROMPT_VERSION)
+        cached_query = self.parse_cache.get(cache_key)
+        if cached_query is not None:
+            return self._cached_parse_result(user_input, cached_query)
+        
+        def parse_and_cache():
+            # A flight for this key may have finished and cached it since our miss
+            cached_query = self.parse_cache.get(cache_key, count_miss=False)
+            if cached_query is not None:
+                return self._cached_parse_result(user_input, cached_query)
+            
+            result = self._parse_with_ollama(user_input)
+            
+            # Only cache real LLM parses - rule-based fallbacks are cheap and may be
+            # the result of a transient Ollama failure
+            if result.get('success') and result.get('method') == 'ollama_llm':
+                self.parse_cache.put(cache_key, result['parsed_query'])
+            return result
+        
+        # Identical inputs arriving while this parse is in flight wait for it, but
+        # no longer than a call of their own could have taken
+        try:
+            result, shared = self.parse_flight.do(cache_key, parse_and_cache, timeout=self.llm_request_budget)
+        except TimeoutError:
+            print(f"⏱️  Shared LLM parse still running after {self.llm_request_budget}s")
+            return self._fallback_to_rules(user_input)
+        if shared:
+            result['original_input'] = user_input
+            result['coalesced'] = True
+        return result
+    
+    @staticmethod
+    def _cached_parse_result(user_input: str, cached_query: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'success': True,
+            'parsed_query': cached_query,
+            'method': 'ollama_llm_cache',
+            'original_input': user_input,
+            'elapsed_time': 0
+        }
+    
+    def _parse_with_ollama(self, user_input: str) -> Dict[str, Any]:
         """Parse natural language using Ollama LLM with improved DELETE detection"""
         
-        system_prompt = """Parse movie database queries into JSON. Return only JSON.
-
-Schema: Movies(title, genres[], year, rating, directors[]), Genres(name)
-Operations: READ, CREATE, UPDATE, DELETE, COUNT, AGGREGATE
-
-IMPORTANT: Pay attention to operation keywords:
-- DELETE words: delete, remove, drop, eliminate, destroy
-- CREATE words: add, create, insert, new, make  
-- UPDATE words: update, modify, change, edit, set
-- READ words: show, get, find, list, search, display
-
-Return format:
-{"operation": "DELETE", "entity": "MOVIE", "filters": {"title": "Deadpool"}}
-
-Examples:
-"delete movie Deadpool" → {"operation": "DELETE", "entity": "MOVIE", "filters": {"title": "Deadpool"}}
-"remove film called Avatar" → {"operation": "DELETE", "entity": "MOVIE", "filters": {"title": "Avatar"}}
-"add movie Inception" → {"operation": "CREATE", "entity": "MOVIE", "data": {"title": "Inception"}}
-"update movie Inception rating to 9.0" → {"operation": "UPDATE", "entity": "MOVIE", "filters": {"title": "Inception"}, "updates": {"rating": 9.0}}
-"show action movies" → {"operation": "READ", "entity": "MOVIE", "filters": {"genre": "Action"}}
-"movies with rating 8.1" → {"operation": "READ", "entity": "MOVIE", "filters": {"rating": 8.1}}"""
-
         prompt = f"Query: '{user_input}'\nJSON:"
         
-        llm_result = self._call_ollama(prompt, system_prompt)
+        llm_result = self._call_ollama(prompt, self.PARSE_SYSTEM_PROMPT, self._parse_output_format())
         
         if llm_result['success']:
             try:
@@ -1552,27 +2143,35 @@ Examples:
                 response_text = llm_result['response'].strip()
                 print(f"🤖 LLM response ({llm_result.get('elapsed_time', 0):.1f}s): {response_text[:100]}...")
                 
-                # Try multiple extraction methods
+                # Schema-constrained output is a bare JSON object - no scanning needed
                 parsed_json = None
+                try:
+                    direct_json = json.loads(response_text)
+                    if isinstance(direct_json, dict):
+                        parsed_json = direct_json
+                except json.JSONDecodeError:
+                    pass
                 
+                # Otherwise fall back to extracting it from prose
                 # Method 1: Look for complete JSON with proper bracket matching
-                bracket_count = 0
-                start_idx = -1
-                for i, char in enumerate(response_text):
-                    if char == '{':
-                        if start_idx == -1:
-                            start_idx = i
-                        bracket_count += 1
-                    elif char == '}':
-                        bracket_count -= 1
-                        if bracket_count == 0 and start_idx != -1:
-                            json_str = response_text[start_idx:i+1]
-                            try:
-                                parsed_json = json.loads(json_str)
-                                print(f"✅ Extracted JSON with bracket matching: {json_str}")
-                                break
-                            except json.JSONDecodeError:
-                                continue
+                if parsed_json is None:
+                    bracket_count = 0
+                    start_idx = -1
+                    for i, char in enumerate(response_text):
+                        if char == '{':
+                            if start_idx == -1:
+                                start_idx = i
+                            bracket_count += 1
+                        elif char == '}':
+                            bracket_count -= 1
+                            if bracket_count == 0 and start_idx != -1:
+                                json_str = response_text[start_idx:i+1]
+                                try:
+                                    parsed_json = json.loads(json_str)
+                                    print(f"✅ Extracted JSON with bracket matching: {json_str}")
+                                    break
+                                except json.JSONDecodeError:
+                                    continue
                 
                 # Method 2: If bracket matching failed, try regex patterns
                 if not parsed_json:
@@ -1647,13 +2246,19 @@ Examples:
     def _fallback_to_rules(self, user_input: str) -> Dict[str, Any]:
         """Fallback to rule-based parsing when LLM fails"""
         print("🔄 Falling back to rule-based parsing")
+        return self._parse_with_rules(user_input)
+    
+    def _parse_with_rules(self, user_input: str) -> Dict[str, Any]:
+        """Parse using the rule-based extractor and score how much of the input it explained"""
         
         user_input_lower = user_input.lower().strip()
         
-        # Determine operation using rules
-        operation = self._determine_operation_rules(user_input_lower)
-        entity = self._determine_entity_rules(user_input_lower)
-        filters = self._extract_filters_rules(user_input)
+        # One pass of the compiled rule engine yields operation, entity and filters
+        scan = RuleEngine.scan(user_input)
+        operation = scan['operation']
+        entity = scan['entity']
+        filters = scan['filters']
+        self._apply_catalog_mentions(user_input, filters)
         
         parsed_query = {
             'operation': operation,
@@ -1673,38 +2278,101 @@ Examples:
             'success': True,
             'parsed_query': parsed_query,
             'method': 'rule_based_fallback',
-            'original_input': user_input
+            'original_input': user_input,
+            'confidence': self._rule_confidence(user_input, parsed_query, scan['operation_keywords'])
         }
     
+    @classmethod
+    def _rule_confidence(cls, user_input: str, parsed_query: Dict[str, Any],
+                         operation_keywords: List[str]) -> float:
+        """Score (0-1) how completely and unambiguously the rules explained the input"""
+        
+        # Raw tokens, not the cache key: every word the user typed must be explained
+        tokens = RAW_TOKEN_PATTERN.findall(user_input.lower())
+        if not tokens:
+            return 0.0
+        if any(token in cls.LLM_ONLY_WORDS or token.endswith("n't") for token in tokens):
+            return 0.0
+        
+        # Tokens that ended up in an extracted filter value count as explained
+        value_words = set()
+        numbers = set()
+        for value in parsed_query.get('filters', {}).values():
+            if isinstance(value, dict):
+                value = value.get('value')
+            if isinstance(value, bool):
+                continue
+            if isinstance(value, (int, float)):
+                numbers.add(float(value))
+            elif isinstance(value, str):
+                value_words.update(value.lower().split())
+        
+        filters = parsed_query.get('filters', {})
+        # An aggregation over ratings fills the rating slot without a filter
+        filled = set(filters)
+        if parsed_query.get('operation_details', {}).get('aggregate_field') == 'rating':
+            filled.add('rating')
+        
+        explained = 0
+        for token in tokens:
+            slot = cls.SLOT_WORDS.get(token)
+            if slot is not None:
+                if slot in filled:
+                    explained += 1
+                continue
+            if token in cls.RULE_VOCABULARY or token in cls.NEUTRAL_WORDS or token in value_words:
+                explained += 1
+                continue
+            try:
+                if float(token) in numbers:
+                    explained += 1
+            except ValueError:
+                pass
+        
+        confidence = explained / len(tokens)
+        # Every word must be accounted for; one dropped modifier changes the answer
+        if explained < len(tokens):
+            confidence = min(confidence, 0.5)
+        
+        # Writes need exact values and aggregations need a function - leave them to the LLM
+        operation = parsed_query.get('operation')
+        if operation in ['CREATE', 'UPDATE', 'DELETE']:
+            confidence = min(confidence, 0.5)
+        elif operation == 'AGGREGATE' and 'operation_details' not in parsed_query:
+            confidence = min(confidence, 0.5)
+        
+        # Several competing operation keywords make the intent ambiguous
+        if len(operation_keywords) > 1:
+            confidence -= 0.25 * (len(operation_keywords) - 1)
+        
+        return round(max(confidence, 0.0), 3)
+    
+    def _parse_input(self, user_input: str) -> Dict[str, Any]:
+        """Parse natural language and snap misspelled names to catalog values"""
+        parsed_result = self._route_parse(user_input)
+        if parsed_result.get('success'):
+            self._canonicalize_filters(parsed_result['parsed_query'], user_input)
+        return parsed_result
+    
+    def _route_parse(self, user_input: str) -> Dict[str, Any]:
+        """Answer confident rule-based parses without the LLM, otherwise ask the LLM"""
+        if not self.ollama_available:
+            return self._fallback_to_rules(user_input)
+        
+        rule_result = self._parse_with_rules(user_input)
+        if rule_result['confidence'] >= self.rule_confidence_threshold:
+            print(f"⚡ Rule-based fast path (confidence {rule_result['confidence']})")
+            rule_result['method'] = 'rule_based_fast_path'
+            return rule_result
+        
+        return self.parse_natural_language_with_llm(user_input)
+    
     def natural_language_to_graphql(self, user_input: str) -> Dict[str, Any]:
         """Convert natural language to GraphQL using LLM or rules"""
         
         try:
-            # Try LLM first if available
-            if self.ollama_available:
-                parsed_result = self.parse_natural_language_with_llm(user_input)
-            else:
-                parsed_result = self._fallback_to_rules(user_input)
-            
-            if not parsed_result['success']:
-                return {
-                    'success': False,
-                    'error': 'Failed to parse natural language input',
-                    'original_input': user_input
-                }
-            
-            parsed = parsed_result['parsed_query']
-            
-            # Generate GraphQL based on parsed components
-            graphql_query = self._generate_graphql_query(parsed)
-            
-            return {
-                'success': True,
-                'graphql_query': graphql_query,
-                'original_input': user_input,
-                'parsed_query': parsed,
-                'parsing_method': parsed_result['method']
-            }
+            parsed_result = self._parse_input(user_input)
+            return self._graphql_from_parsed(user_input, parsed_result)
             
         except Exception as e:
             return {
@@ -1713,41 +2381,37 @@ Examples:
                 'original_input': user_input
             }
     
+    def _graphql_from_parsed(self, user_input: str, parsed_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the GraphQL approach result from an already parsed input"""
+        
+        if not parsed_result['success']:
+            return {
+                'success': False,
+                'error': 'Failed to parse natural language input',
+                'original_input': user_input
+            }
+        
+        parsed = parsed_result['parsed_query']
+        
+        # Pick a fixed operation; parsed values only travel as variables
+        document_id, variables = self._generate_graphql_query(parsed)
+        
+        return {
+            'success': True,
+            'graphql_query': OPERATIONS[document_id],
+            'graphql_document_id': document_id,
+            'graphql_variables': variables,
+            'original_input': user_input,
+            'parsed_query': parsed,
+            'parsing_method': parsed_result['method']
+        }
+    
     def natural_language_to_mongodb(self, user_input: str) -> Dict[str, Any]:
         """Convert natural language to MongoDB query using LLM or rules"""
         
         try:
-            # Try LLM first if available
-            if self.ollama_available:
-                parsed_result = self.parse_natural_language_with_llm(user_input)
-            else:
-                parsed_result = self._fallback_to_rules(user_input)
-            
-            if not parsed_result['success']:
-                return {
-                    'success': False,
-                    'error': 'Failed to parse natural language input',
-                    'original_input': user_input
-                }
-            
-            parsed = parsed_result['parsed_query']
-            
-            # Generate MongoDB query based on parsed components
-            mongo_query = self._generate_mongodb_query(parsed)
-            
-            print(f"Generated MongoDB query: {mongo_query}")
-            
-            # Execute the MongoDB query
-            result = self._execute_mongodb_query(mongo_query)
-            
-            return {
-                'success': True,
-                'mongodb_query': mongo_query,
-                'query_result': result,
-                'original_input': user_input,
-                'parsed_query': parsed,
-                'parsing_method': parsed_result['method']
-            }
+            parsed_result = self._parse_input(user_input)
+            return self._mongodb_from_parsed(user_input, parsed_result)
             
         except Exception as e:
             print(f"Error in natural_language_to_mongodb: {e}")
@@ -1757,8 +2421,44 @@ Examples:
                 'original_input': user_input
             }
     
-    def _generate_graphql_query(self, parsed: Dict[str, Any]) -> str:
-        """Generate GraphQL query from parsed components - FIXED to route operations correctly"""
+    def _mongodb_from_parsed(self, user_input: str, parsed_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Build and execute the MongoDB approach from an already parsed input"""
+        
+        if not parsed_result['success']:
+            return {
+                'success': False,
+                'error': 'Failed to parse natural language input',
+                'original_input': user_input
+            }
+        
+        parsed = parsed_result['parsed_query']
+        
+        # Generate MongoDB query based on parsed components
+        start = time.perf_counter()
+        mongo_query = self._generate_mongodb_query(parsed)
+        generated = time.perf_counter()
+        
+        print(f"Generated MongoDB query: {mongo_query}")
+        
+        # Execute the MongoDB query
+        result = self._execute_mongodb_query(mongo_query)
+        finished = time.perf_counter()
+        
+        return {
+            'success': True,
+            'mongodb_query': mongo_query,
+            'query_result': result,
+            'original_input': user_input,
+            'parsed_query': parsed,
+            'parsing_method': parsed_result['method'],
+            'timings': {
+                'generate_ms': round((generated - start) * 1000, 2),
+                'execute_ms': round((finished - generated) * 1000, 2)
+            }
+        }
+    
+    def _generate_graphql_query(self, parsed: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Pick the GraphQL operation for parsed components; returns (document_id, variables)"""
         
         operation = parsed.get('operation', 'READ')
         
@@ -1768,141 +2468,48 @@ Examples:
         else:  # READ, COUNT, AGGREGATE
             return self._generate_graphql_query_read(parsed)
     
-    def _generate_graphql_query_read(self, parsed: Dict[str, Any]) -> str:
-        """Generate GraphQL read query with correct field names for PyMongo schema"""
+    @staticmethod
+    def _numeric_filter_value(value: Any, key: str, default: float) -> Any:
+        """Plain number from a filter that may be {'operator': ..., 'value': n}"""
+        if isinstance(value, dict):
+            if 'value' in value:
+                return value['value']
+            if key in value:
+                return value[key]
+            # Fallback - try to find any numeric value
+            return next((v for v in value.values() if isinstance(v, (int, float))), default)
+        return value
+    
+    @staticmethod
+    def _as_list(value: Any) -> List[Any]:
+        return [value] if isinstance(value, str) else list(value)
+    
+    def _generate_graphql_query_read(self, parsed: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Pick the read operation (see graphql_operations.py) and its variables"""
         
         entity = parsed.get('entity', 'MOVIE')
         filters = parsed.get('filters', {})
         
-        if entity == 'MOVIE':
-            if not filters:
-                return '''
-                query {
-                  allMoviesList {
-                    title
-                    year
-                    rating
-                    genres
-                    directors
-                  }
-                }
-                '''
-            elif 'title' in filters:
-                title = filters['title']
-                return f'''
-                query {{
-                  movieByTitle(title: "{title}") {{
-                    title
-                    year
-                    rating
-                    genres
-                    directors
-                  }}
-                }}
-                '''
-            elif 'genre' in filters:
-                genre = filters['genre']
-                return f'''
-                query {{
-                  moviesByGenre(genre: "{genre}") {{
-                    title
-                    year
-                    rating
-                    genres
-                    directors
-                    runtime
-                  }}
-                }}
-                '''
-            elif 'year' in filters:
-                # FIXED: Handle complex year filter objects
-                year_filter = filters['year']
-                if isinstance(year_filter, dict):
-                    # Extract the actual year value from complex filter
-                    if 'value' in year_filter:
-                        year = year_filter['value']
-                    elif 'year' in year_filter:
-                        year = year_filter['year']
-                    else:
-                        # Fallback - try to find any numeric value
-                        year = next((v for v in year_filter.values() if isinstance(v, (int, float))), 2020)
-                else:
-                    year = year_filter
-                
-                return f'''
-                query {{
-                  moviesByYear(year: {year}) {{
-                    title
-                    year
-                    rating
-                    genres
-                    directors
-                  }}
-                }}
-                '''
-            elif 'rating' in filters:
-                # FIXED: Handle complex rating filter objects  
-                rating_filter = filters['rating']
-                if isinstance(rating_filter, dict):
-                    # Extract the actual rating value
-                    if 'value' in rating_filter:
-                        rating = rating_filter['value']
-                    elif 'rating' in rating_filter:
-                        rating = rating_filter['rating']
-                    else:
-                        # Fallback - try to find any numeric value
-                        rating = next((v for v in rating_filter.values() if isinstance(v, (int, float))), 8.0)
-                else:
-                    rating = rating_filter
-                
-                return f'''
-                query {{
-                  moviesByRating(minRating: {rating}) {{
-                    title
-                    year
-                    rating
-                    genres
-                    directors
-                  }}
-                }}
-                '''
-            else:
-                return '''
-                query {
-                  allMoviesList {
-                    title
-                    year
-                    rating
-                    genres
-                    directors
-                  }
-                }
-                '''
-                
-        elif entity == 'GENRE':
-            return '''
-            query {
-              allGenresList {
-                name
-                description
-              }
-            }
-            '''
-        
-        # Default fallback
-        return '''
-        query {
-          allMoviesList {
-            title
-            year
-            rating
-            genres
-          }
-        }
-        '''
+        if entity == 'GENRE':
+            return 'AllGenres', {}
+        
+        if 'title' in filters:
+            return 'MovieByTitle', {'title': str(filters['title'])}
+        if 'genre' in filters:
+            return 'MoviesByGenre', {'genre': str(filters['genre'])}
+        if 'year' in filters:
+            # FIXED: Handle complex year filter objects
+            year = self._numeric_filter_value(filters['year'], 'year', 2020)
+            return 'MoviesByYear', {'year': int(year)}
+        if 'rating' in filters:
+            # FIXED: Handle complex rating filter objects
+            rating = self._numeric_filter_value(filters['rating'], 'rating', 8.0)
+            return 'MoviesByRating', {'minRating': float(rating)}
+        
+        return 'AllMovies', {}
 
-    def _generate_graphql_mutation(self, parsed: Dict[str, Any]) -> str:
-        """Generate GraphQL mutation for CREATE, UPDATE, DELETE operations"""
+    def _generate_graphql_mutation(self, parsed: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Pick the mutation for CREATE, UPDATE, DELETE operations; ValueError if none fits"""
         
         operation = parsed.get('operation')
         entity = parsed.get('entity')
@@ -1912,57 +2519,22 @@ Examples:
         if operation == 'DELETE':
             if entity == 'MOVIE':
                 title = filters.get('title', '')
-                if title:
-                    return f'''
-                    mutation {{
-                      deleteMovieByTitle(title: "{title}") {{
-                        result {{
-                          success
-                          message
-                        }}
-                      }}
-                    }}
-                    '''
-                else:
-                    return '''
-                    query {
-                      error: "Cannot delete movie without specifying title"
-                    }
-                    '''
+                if not title:
+                    raise ValueError("Cannot delete movie without specifying title")
+                return 'DeleteMovieByTitle', {'title': str(title)}
             
             elif entity == 'GENRE':
                 name = filters.get('name') or filters.get('title', '')
-                return f'''
-                mutation {{
-                  deleteGenreByName(name: "{name}") {{
-                    result {{
-                      success
-                      message
-                    }}
-                  }}
-                }}
-                '''
+                return 'DeleteGenreByName', {'name': str(name)}
         
         elif operation == 'CREATE':
             if entity == 'MOVIE':
                 # Extract data for creation - FIXED to handle both LLM and rule-based parsing
                 title = filters.get('title', 'New Movie')
-                year = filters.get('year', 2024)
-                rating = filters.get('rating', 0.0)
-                genres = []
-                directors = []
-                
-                # Handle genre
-                if 'genre' in filters:
-                    genres = [filters['genre']] if isinstance(filters['genre'], str) else filters['genre']
-                else:
-                    genres = ['Unknown']
-                
-                # Handle director
-                if 'director' in filters:
-                    directors = [filters['director']] if isinstance(filters['director'], str) else filters['director']
-                else:
-                    directors = ['Unknown']
+                year = self._numeric_filter_value(filters.get('year', 2024), 'year', 2024)
+                rating = self._numeric_filter_value(filters.get('rating', 0.0), 'rating', 0.0)
+                genres = self._as_list(filters['genre']) if 'genre' in filters else ['Unknown']
+                directors = self._as_list(filters['director']) if 'director' in filters else ['Unknown']
                 
                 # Handle LLM data structure
                 if 'data' in parsed:
@@ -1971,33 +2543,17 @@ Examples:
                     year = data.get('year', year)
                     rating = data.get('rating', rating)
                     if 'genre' in data:
-                        genres = [data['genre']] if isinstance(data['genre'], str) else data['genre']
+                        genres = self._as_list(data['genre'])
                     if 'director' in data:
-                        directors = [data['director']] if isinstance(data['director'], str) else data['director']
+                        directors = self._as_list(data['director'])
                 
-                # Format for GraphQL
-                genres_str = json.dumps(genres)
-                directors_str = json.dumps(directors)
-                
-                return f'''
-                mutation {{
-                  createMovie(
-                    title: "{title}"
-                    year: {year}
-                    rating: {rating}
-                    genres: {genres_str}
-                    directors: {directors_str}
-                  ) {{
-                    movie {{
-                      title
-                      year
-                      rating
-                      genres
-                      directors
-                    }}
-                  }}
-                }}
-                '''
+                return 'CreateMovie', {
+                    'title': str(title),
+                    'year': int(year),
+                    'rating': float(rating),
+                    'genres': genres,
+                    'directors': directors
+                }
             
             elif entity == 'GENRE':
                 name = filters.get('title') or filters.get('name', 'New Genre')
@@ -2008,59 +2564,39 @@ Examples:
                 elif 'data' in parsed and 'title' in parsed['data']:
                     name = parsed['data']['title']
                 
-                return f'''
-                mutation {{
-                  createGenre(name: "{name}", description: "{description}") {{
-                    genre {{
-                      name
-                      description
-                    }}
-                  }}
-                }}
-                '''
+                return 'CreateGenre', {'name': str(name), 'description': str(description)}
         
         elif operation == 'UPDATE':
             if entity == 'MOVIE':
                 title = filters.get('title', '')
-                update_fields = []
+                variables = {}
                 
-                # Build update fields from updates dict
+                # Build update variables from updates dict
                 for field, value in updates.items():
                     if field == 'title':
-                        update_fields.append(f'title: "{value}"')
+                        variables['newTitle'] = str(value)
                     elif field == 'year':
-                        update_fields.append(f'year: {value}')
+                        variables['year'] = int(self._numeric_filter_value(value, 'year', 0))
                     elif field == 'rating':
-                        update_fields.append(f'rating: {value}')
+                        variables['rating'] = float(self._numeric_filter_value(value, 'rating', 0.0))
                     elif field == 'genre':
-                        genres = [value] if isinstance(value, str) else value
-                        update_fields.append(f'genres: {json.dumps(genres)}')
+                        variables['genres'] = self._as_list(value)
                 
-                if update_fields and title:
-                    fields_str = ', '.join(update_fields)
-                    return f'''
-                    mutation {{
-                      updateMovieByTitle(title: "{title}", {fields_str}) {{
-                        movie {{
-                          title
-                          year
-                          rating
-                          genres
-                          directors
-                        }}
-                      }}
-                    }}
-                    '''
-        
-        # Fallback
-        return '''
-        query {
-          error: "Could not generate appropriate mutation"
-        }
-        '''
+                if variables and title:
+                    return 'UpdateMovieByTitle', {'title': str(title), **variables}
+        
+        raise ValueError("Could not generate appropriate mutation")
     
     def _generate_mongodb_query(self, parsed: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate MongoDB query from parsed components - FIXED to pass parsed data"""
+        """Generate MongoDB query and attach the collation its filter relies on"""
+        query_info = self._build_mongodb_query(parsed)
+        collation = self.filter_compiler.collation_for(parsed.get('filters', {}))
+        if collation and query_info['operation'] != 'insert_one':
+            query_info['collation'] = collation
+        return query_info
+    
+    def _build_mongodb_query(self, parsed: Dict[str, Any]) -> Dict[str, Any]:
+        """Build MongoDB query from parsed components - FIXED to pass parsed data"""
         
         operation = parsed.get('operation', 'READ')
         entity = parsed.get('entity', 'MOVIE')
@@ -2280,7 +2816,7 @@ Examples:
         return {
             'collection': collection,
             'operation': 'update_one',
-            'filter': mongo_filter or {'title': {'$regex': filters.get('title', ''), '$options': 'i'}},
+            'filter': mongo_filter or {'title': self.filter_compiler.text_condition('title', filters.get('title', ''))},
             'update': update_doc
         }
     
@@ -2289,12 +2825,10 @@ Examples:
         mongo_filter = {}
         
         for filter_name, filter_value in filters.items():
-            if filter_name == 'title':
-                # Title field
-                mongo_filter['title'] = {'$regex': filter_value, '$options': 'i'}
-            elif filter_name == 'genre':
-                # FIXED: Map 'genre' filter to 'genres' field (plural) in movies collection
-                mongo_filter['genres'] = {'$regex': filter_value, '$options': 'i'}
+            if filter_name in TEXT_FIELDS:
+                # 'genre' -> 'genres', 'director' -> 'directors', 'actor' -> 'actors';
+                # exact/prefix/collated conditions so the field indexes are used
+                mongo_filter[TEXT_FIELDS[filter_name]] = self.filter_compiler.text_condition(filter_name, filter_value)
             elif filter_name == 'year':
                 mongo_filter['year'] = filter_value
             elif filter_name == 'rating':
@@ -2327,12 +2861,6 @@ Examples:
                 else:
                     # IMPROVED: Direct value - handle exact matches
                     mongo_filter['rating'] = filter_value
-            elif filter_name == 'director':
-                # Map to 'directors' field (plural)
-                mongo_filter['directors'] = {'$regex': re.escape(filter_value), '$options': 'i'}
-            elif filter_name == 'actor':
-                # Map to 'actors' field (plural)
-                mongo_filter['actors'] = {'$regex': re.escape(filter_value), '$options': 'i'}
         
         return mongo_filter
     
@@ -2387,112 +2915,6 @@ Examples:
         else:
             return {}
 
-    # FIXED: Rule-based fallback methods with improved DELETE detection
-    def _determine_operation_rules(self, text: str) -> str:
-        """Determine operation using improved rule-based approach - FIXED DELETE priority"""
-        text_lower = text.lower().strip()
-        
-        # Check for DELETE first (highest priority for this issue)
-        if re.search(r'\b(delete|remove|drop|eliminate|destroy)\b', text_lower):
-            return 'DELETE'
-        
-        # Check for CREATE
-        if re.search(r'\b(add|create|insert|new|make)\b', text_lower):
-            return 'CREATE'
-        
-        # Check for UPDATE  
-        if re.search(r'\b(update|modify|change|edit|set|alter)\b', text_lower):
-            return 'UPDATE'
-        
-        # Check for COUNT
-        if re.search(r'\b(count|how many|number of)\b', text_lower):
-            return 'COUNT'
-        
-        # Check for AGGREGATE
-        if re.search(r'\b(average|mean|sum|total|max|min|highest|lowest)\b', text_lower):
-            return 'AGGREGATE'
-        
-        # Default to READ for everything else
-        return 'READ'
-    
-    def _determine_entity_rules(self, text: str) -> str:
-        """Determine entity using rule-based approach"""
-        for entity, pattern in self.entity_patterns.items():
-            if re.search(pattern, text, re.IGNORECASE):
-                return entity
-        return 'MOVIE'
-    
-    def _extract_filters_rules(self, text: str) -> Dict[str, Any]:
-        """Extract filters using rule-based approach - FIXED rating extraction"""
-        filters = {}
-        
-        # Extract genre
-        genre_match = re.search(r'\b(action|comedy|drama|thriller|horror|sci-fi|romance|fantasy|adventure|crime|documentary|animation|biography|history|mystery|war|western|musical|sport)\b', text, re.IGNORECASE)
-        if genre_match:
-            filters['genre'] = genre_match.group().title()
-        
-        # Extract year
-        year_match = re.search(r'\b(19|20)\d{2}\b', text)
-        if year_match:
-            filters['year'] = int(year_match.group())
-        
-        # FIXED: Enhanced rating extraction
-        rating_patterns = [
-            # Comparative operators
-            (r'rating\s*(?:is\s+)?(?:above|over|greater\s+than|>|>=)\s*(\d+\.?\d*)', 'above'),
-            (r'rating\s*(?:is\s+)?(?:below|under|less\s+than|<|<=)\s*(\d+\.?\d*)', 'below'),
-            
-            # Exact matches - multiple patterns
-            (r'with\s+rating\s+(\d+\.?\d*)', 'exact'),
-            (r'rating\s+(?:is\s+|equals?\s+|=\s*)?(\d+\.?\d*)', 'exact'),
-            (r'rated\s+(\d+\.?\d*)', 'exact'),
-            (r'(?:^|\s)(\d+\.?\d*)\s+rating', 'exact'),  # "8.1 rating"
-            (r'rating:\s*(\d+\.?\d*)', 'exact'),  # "rating: 8.1"
-        ]
-        
-        for pattern, operation_type in rating_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                if operation_type == 'above':
-                    filters['rating'] = {
-                        'operator': 'above',
-                        'value': float(match.group(1))
-                    }
-                elif operation_type == 'below':
-                    filters['rating'] = {
-                        'operator': 'below', 
-                        'value': float(match.group(1))
-                    }
-                elif operation_type == 'exact':
-                    filters['rating'] = float(match.group(1))
-                break  # Use first match found
-        
-        # Extract title - more patterns
-        title_patterns = [
-            r'(?:called|named|titled|with name)\s+["\']([^"\']+)["\']',
-            r'(?:called|named|titled|with name)\s+([A-Za-z0-9\s]+?)(?:\s|$)',
-            r'movie\s+["\']([^"\']+)["\']',
-            r'film\s+["\']([^"\']+)["\']'
-        ]
-        
-        for pattern in title_patterns:
-            title_match = re.search(pattern, text, re.IGNORECASE)
-            if title_match:
-                filters['title'] = title_match.group(1).strip()
-                break
-        
-        # Extract director
-        director_match = re.search(r'(?:directed\s+by|director\s*:?)\s+([A-Za-z\s]+?)(?:\s|$)', text, re.IGNORECASE)
-        if director_match:
-            filters['director'] = director_match.group(1).strip()
-        
-        # Extract actor
-        actor_match = re.search(r'(?:starring|actor\s*:?|stars?)\s+([A-Za-z\s]+?)(?:\s|$)', text, re.IGNORECASE)
-        if actor_match:
-            filters['actor'] = actor_match.group(1).strip()
-        
-        return filters
-    
         # llm_processor.py - FIXED _execute_mongodb_query method excerpt
 
     def _execute_mongodb_query(self, query_info: Dict[str, Any]) -> Any:
@@ -2509,12 +2931,41 @@ Examples:
             collection = self.db[query_info['collection']]
             operation = query_info['operation']
             
+            # Case-insensitive equality filters only match (and only hit the
+            # collated indexes) when the query carries the same collation
+            collation = query_info.get('collation')
+            
             print(f"Executing {operation} on collection {query_info['collection']}")
             
-            if operation == 'find':
+            if operation == 'find' and 'page_token' in query_info:
+                # Keyset pagination: page_token is null for the first page,
+                # then the next_page_token of the previous response
+                results, next_page_token = paginate(
+                    collection,
+                    query_info['filter'],
+                    query_info.get('sort_by', '_id'),
+                    first=query_info.get('limit'),
+                    after=query_info['page_token'],
+                    projection=query_info.get('projection'),
+                    collation=collation
+                )
+                
+                for result in results:
+                    if '_id' in result:
+                        result['_id'] = str(result['_id'])
+                
+                return {
+                    'results': results,
+                    'count': len(results),
+                    'next_page_token': next_page_token,
+                    'operation': operation
+                }
+                
+            elif operation == 'find':
                 cursor = collection.find(
                     query_info['filter'],
-                    query_info.get('projection')
+                    query_info.get('projection'),
+                    collation=collation
                 )
                 
                 if 'limit' in query_info and query_info['limit']:
@@ -2534,7 +2985,7 @@ Examples:
                 }
                 
             elif operation == 'aggregate':
-                results = list(collection.aggregate(query_info['pipeline']))
+                results = list(collection.aggregate(query_info['pipeline'], collation=collation))
                 
                 # Convert ObjectIds to strings in aggregation results
                 for result in results:
@@ -2549,6 +3000,12 @@ Examples:
             elif operation == 'insert_one':
                 result = collection.insert_one(query_info['document'])
                 
+                # Keep the catalog index in step with new titles, people and genres
+                if query_info['collection'] in ['movies', 'genres']:
+                    for kind, name in self._catalog_entries(query_info['collection'], query_info['document']):
+                        self.gazetteer.add(kind, name)
+                        self.fuzzy_index.add(kind, name)
+                
                 # FIXED: Return clean response without the original document containing ObjectId
                 return {
                     'inserted_id': str(result.inserted_id),
@@ -2561,8 +3018,17 @@ Examples:
             elif operation == 'update_one':
                 result = collection.update_one(
                     query_info['filter'],
-                    query_info['update']
+                    query_info['update'],
+                    collation=collation
                 )
+                if result.modified_count:
+                    # New names are usable at once; removed ones go with the background rebuild
+                    if query_info['collection'] in ['movies', 'genres']:
+                        changes = query_info['update'].get('$set', {}) if isinstance(query_info['update'], dict) else {}
+                        for kind, name in self._catalog_entries(query_info['collection'], changes):
+                            self.gazetteer.add(kind, name)
+                            self.fuzzy_index.add(kind, name)
+                    self.gazetteer.invalidate()
                 return {
                     'matched_count': result.matched_count,
                     'modified_count': result.modified_count,
@@ -2570,14 +3036,16 @@ Examples:
                 }
                 
             elif operation == 'delete_one':
-                result = collection.delete_one(query_info['filter'])
+                result = collection.delete_one(query_info['filter'], collation=collation)
+                if result.deleted_count:
+                    self.gazetteer.invalidate()
                 return {
                     'deleted_count': result.deleted_count,
                     'operation': operation
                 }
                 
             elif operation == 'count_documents':
-                count = collection.count_documents(query_info['filter'])
+                count = collection.count_documents(query_info['filter'], collation=collation)
                 return {
                     'count': count,
                     'operation': operation
@@ -2597,11 +3065,32 @@ Examples:
             }
 
 
-    def compare_graphql_vs_mongodb(self, user_input: str) -> Dict[str, Any]:
-        """Compare GraphQL and MongoDB approaches for the same query"""
+    def compare_graphql_vs_mongodb(self, user_input: str,
+                                   graphql_executor: Optional[Callable[[str, Dict[str, Any]], Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Compare GraphQL and MongoDB approaches for the same query.
+
+        The input is parsed once; the GraphQL and MongoDB sides are then
+        generated and executed concurrently. graphql_executor, when given,
+        runs the generated GraphQL document with its variables and returns
+        {'data', 'errors'}.
+        """
         
-        graphql_result = self.natural_language_to_graphql(user_input)
-        mongodb_result = self.natural_language_to_mongodb(user_input)
+        total_start = time.perf_counter()
+        
+        try:
+            parsed_result = self._parse_input(user_input)
+        except Exception as e:
+            parsed_result = {'success': False, 'error': str(e)}
+        parse_ms = (time.perf_counter() - total_start) * 1000
+        
+        graphql_future = self._compare_pool.submit(
+            self._timed_graphql_side, user_input, copy.deepcopy(parsed_result), graphql_executor
+        )
+        mongodb_future = self._compare_pool.submit(
+            self._timed_mongodb_side, user_input, copy.deepcopy(parsed_result)
+        )
+        graphql_result = graphql_future.result()
+        mongodb_result = mongodb_future.result()
         
         return {
             'user_input': user_input,
@@ -2611,15 +3100,71 @@ Examples:
                 'graphql_success': graphql_result.get('success', False),
                 'mongodb_success': mongodb_result.get('success', False),
                 'both_successful': graphql_result.get('success', False) and mongodb_result.get('success', False)
+            },
+            'timings': {
+                'parse_ms': round(parse_ms, 2),
+                'parsing_method': parsed_result.get('method'),
+                'graphql_ms': graphql_result['timings']['total_ms'],
+                'mongodb_ms': mongodb_result['timings']['total_ms'],
+                'total_ms': round((time.perf_counter() - total_start) * 1000, 2)
             }
         }
     
+    def _timed_graphql_side(self, user_input: str, parsed_result: Dict[str, Any],
+                            graphql_executor: Optional[Callable[[str, Dict[str, Any]], Dict[str, Any]]]) -> Dict[str, Any]:
+        """Generate (and optionally execute) the GraphQL side of a comparison"""
+        
+        start = time.perf_counter()
+        try:
+            result = self._graphql_from_parsed(user_input, parsed_result)
+        except Exception as e:
+            result = {'success': False, 'error': str(e), 'original_input': user_input}
+        generated = time.perf_counter()
+        
+        if result['success'] and graphql_executor is not None:
+            try:
+                result['execution_result'] = graphql_executor(result['graphql_query'], result['graphql_variables'])
+            except Exception as e:
+                result['execution_error'] = str(e)
+        finished = time.perf_counter()
+        
+        result['timings'] = {
+            'generate_ms': round((generated - start) * 1000, 2),
+            'execute_ms': round((finished - generated) * 1000, 2),
+            'total_ms': round((finished - start) * 1000, 2)
+        }
+        return result
+    
+    def _timed_mongodb_side(self, user_input: str, parsed_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate and execute the MongoDB side of a comparison"""
+        
+        start = time.perf_counter()
+        try:
+            result = self._mongodb_from_parsed(user_input, parsed_result)
+        except Exception as e:
+            print(f"Error in natural_language_to_mongodb: {e}")
+            result = {'success': False, 'error': str(e), 'original_input': user_input}
+        
+        result.setdefault('timings', {})['total_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+    
     def get_connection_status(self) -> Dict[str, Any]:
         """Get connection status information"""
         return {
             'mongodb_connected': self.mongodb_connected,
             'mongodb_uri_provided': self.mongodb_uri is not None,
+            'mongodb_pool': pool_config(),
             'database_name': 'imdb' if self.mongodb_connected else None,
             'ollama_available': self.ollama_available,
-            'ollama_model': self.model_name
+            'ollama_model': self.model_name,
+            'ollama_circuit': self.ollama_breaker.stats(),
+            'llm_dispatcher': self.llm_dispatcher.stats(),
+            'ollama_model_warmth': self.model_warmth.stats(),
+            'ollama_prompt_context': self.prompt_context_status(),
+            'ollama_last_health_check': self.last_health_check,
+            'ollama_client': self.ollama.config(),
+            'parse_cache': self.parse_cache.stats(),
+            'parse_single_flight': self.parse_flight.stats(),
+            'catalog_index': self.gazetteer.stats(),
+            'fuzzy_index': self.fuzzy_index.stats()
         }
\ No newline at end of file
@@ -0,0 +1,87 @@
+# mongo_connection.py - One configured MongoClient per process, shared by every component
+import importlib.util
+import os
+import threading
+from typing import Dict, Any, List, Optional
+
+from pymongo import MongoClient
+
+_lock = threading.Lock()
+_client: Optional[MongoClient] = None
+_client_pid: Optional[int] = None
+_client_options: Dict[str, Any] = {}
+
+
+def available_compressors() -> List[str]:
+    """Wire compressors this interpreter can use, best first (zlib is always built in)"""
+    compressors = []
+    if importlib.util.find_spec('zstandard') is not None:
+        compressors.append('zstd')
+    if importlib.util.find_spec('snappy') is not None:
+        compressors.append('snappy')
+    compressors.append('zlib')
+    return compressors
+
+
+def client_options() -> Dict[str, Any]:
+    """MongoClient keyword arguments from the environment"""
+    compressors = os.getenv('MONGO_COMPRESSORS')
+    return {
+        'maxPoolSize': int(os.getenv('MONGO_MAX_POOL_SIZE', '50')),
+        'minPoolSize': int(os.getenv('MONGO_MIN_POOL_SIZE', '0')),
+        'maxIdleTimeMS': int(os.getenv('MONGO_MAX_IDLE_TIME_MS', '60000')),
+        'serverSelectionTimeoutMS': int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000')),
+        'connectTimeoutMS': int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', '5000')),
+        'compressors': compressors if compressors is not None else ','.join(available_compressors()),
+        'readPreference': os.getenv('MONGO_READ_PREFERENCE', 'primary'),
+        'appname': os.getenv('MONGO_APP_NAME', 'nl-movie-query')
+    }
+
+
+def get_client(uri: Optional[str] = None) -> MongoClient:
+    """The process-wide MongoClient, created on first use.
+
+    A client must not be shared across fork(), so a worker forked by
+    gunicorn gets its own client the first time it asks for one.
+    """
+    global _client, _client_pid, _client_options
+
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _lock:
+        if _client is None or _client_pid != pid:
+            _client_options = client_options()
+            _client = MongoClient(uri or os.getenv('MONGODB_URI'), **_client_options)
+            _client_pid = pid
+        return _client
+
+
+def get_database(name: Optional[str] = None, uri: Optional[str] = None):
+    """Database handle on the shared client (MONGODB_DATABASE, default imdb)"""
+    return get_client(uri)[name or os.getenv('MONGODB_DATABASE', 'imdb')]
+
+
+def get_collection(name: str, database: Optional[str] = None):
+    """Collection handle on the shared client"""
+    return get_database(database)[name]
+
+
+def close_client():
+    """Close the shared client (e.g. at shutdown); the next call reconnects"""
+    global _client, _client_pid
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+
+def pool_config() -> Dict[str, Any]:
+    """Settings of the current client for status endpoints"""
+    return {
+        'initialized': _client is not None and _client_pid == os.getpid(),
+        'pid': _client_pid,
+        **_client_options
+    }
@@ -0,0 +1,244 @@
+# ollama_client.py - Pooled keep-alive HTTP client for the Ollama API
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class OllamaClient:
+    """Keep-alive requests.Session shared by all Flask worker threads.
+
+    Connections to Ollama are pooled instead of opened per call. Only
+    connection failures are retried (with exponential backoff): a generate
+    request that already reached the server is never sent twice.
+    """
+
+    def __init__(self, base_url: str, pool_size: Optional[int] = None,
+                 connect_timeout: Optional[float] = None, read_timeout: Optional[float] = None,
+                 max_retries: Optional[int] = None, backoff_factor: Optional[float] = None):
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size or int(os.getenv('OLLAMA_POOL_SIZE', '10'))
+        self.connect_timeout = connect_timeout or float(os.getenv('OLLAMA_CONNECT_TIMEOUT', '3'))
+        self.read_timeout = read_timeout or float(os.getenv('OLLAMA_READ_TIMEOUT', '25'))
+        if max_retries is None:
+            max_retries = int(os.getenv('OLLAMA_MAX_RETRIES', '2'))
+        if backoff_factor is None:
+            backoff_factor = float(os.getenv('OLLAMA_RETRY_BACKOFF', '0.2'))
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=backoff_factor,
+            allowed_methods=None,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_size,
+            max_retries=retry,
+            pool_block=False
+        )
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _timeout(self, read_timeout: Optional[float]):
+        return (self.connect_timeout, read_timeout or self.read_timeout)
+
+    def get(self, path: str, read_timeout: Optional[float] = None) -> requests.Response:
+        """GET an Ollama endpoint, e.g. /api/tags"""
+        return self.session.get(f"{self.base_url}{path}", timeout=self._timeout(read_timeout))
+
+    def post(self, path: str, payload: Dict[str, Any], read_timeout: Optional[float] = None,
+             stream: bool = False) -> requests.Response:
+        """POST a JSON payload to an Ollama endpoint, e.g. /api/generate"""
+        return self.session.post(
+            f"{self.base_url}{path}",
+            json=payload,
+            timeout=self._timeout(read_timeout),
+            stream=stream
+        )
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+    def config(self) -> Dict[str, Any]:
+        """Connection settings for status endpoints"""
+        return {
+            'base_url': self.base_url,
+            'pool_size': self.pool_size,
+            'connect_timeout': self.connect_timeout,
+            'read_timeout': self.read_timeout
+        }
+
+
+def parse_keep_alive(value) -> float:
+    """Seconds an Ollama keep_alive value keeps the model loaded ('30m', '1h', 300, '-1' = forever)"""
+    match = re.fullmatch(r'\s*(-?\d+(?:\.\d+)?)\s*([smh]?)\s*', str(value))
+    if match is None:
+        return 300.0
+    amount = float(match.group(1))
+    if amount < 0:
+        return float('inf')
+    return amount * {'': 1, 's': 1, 'm': 60, 'h': 3600}[match.group(2)]
+
+
+def warm_up_model(client: OllamaClient, model: str, keep_alive=None,
+                  read_timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Load a model into memory with an empty prompt and pin it for keep_alive.
+
+    Returns success, wall-clock seconds and Ollama's reported load time.
+    """
+    payload = {'model': model, 'prompt': '', 'stream': False}
+    if keep_alive is not None:
+        payload['keep_alive'] = keep_alive
+
+    start_time = time.time()
+    try:
+        response = client.post(
+            '/api/generate', payload,
+            read_timeout=read_timeout or float(os.getenv('OLLAMA_WARMUP_TIMEOUT', '120'))
+        )
+        elapsed = time.time() - start_time
+        if response.status_code != 200:
+            return {'success': False, 'elapsed_time': elapsed,
+                    'error': f"Ollama API error: {response.status_code}"}
+        return {
+            'success': True,
+            'elapsed_time': elapsed,
+            'load_ms': response.json().get('load_duration', 0) / 1e6
+        }
+    except Exception as e:
+        return {'success': False, 'elapsed_time': time.time() - start_time, 'error': str(e)}
+
+
+class ModelWarmth:
+    """Tracks whether the model is probably still loaded and splits call latency into cold and warm.
+
+    A call is cold when Ollama reports a long load_duration or, when that is
+    unknown (early-stopped streams), when the model has been idle longer
+    than keep_alive.
+    """
+
+    def __init__(self, keep_alive_seconds: float, cold_load_ms: float = 500.0):
+        self.keep_alive_seconds = keep_alive_seconds
+        self.cold_load_ms = cold_load_ms
+        self._lock = threading.Lock()
+        self._last_used: Optional[float] = None
+        self._latency = {kind: {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0} for kind in ['cold', 'warm']}
+        self.warmups = 0
+        self.last_warmup_ms: Optional[float] = None
+
+    def is_warm(self) -> bool:
+        last_used = self._last_used
+        return last_used is not None and time.time() - last_used < self.keep_alive_seconds
+
+    def idle_seconds(self) -> Optional[float]:
+        return None if self._last_used is None else time.time() - self._last_used
+
+    def mark_used(self):
+        self._last_used = time.time()
+
+    def record_warmup(self, elapsed_time: float):
+        with self._lock:
+            self.warmups += 1
+            self.last_warmup_ms = round(elapsed_time * 1000, 1)
+        self.mark_used()
+
+    def record_call(self, elapsed_time: float, load_ms: Optional[float] = None) -> str:
+        """Record one generate call; returns 'cold' or 'warm'"""
+        if load_ms is not None:
+            kind = 'cold' if load_ms >= self.cold_load_ms else 'warm'
+        else:
+            kind = 'warm' if self.is_warm() else 'cold'
+
+        elapsed_ms = elapsed_time * 1000
+        with self._lock:
+            latency = self._latency[kind]
+            latency['calls'] += 1
+            latency['total_ms'] += elapsed_ms
+            latency['max_ms'] = max(latency['max_ms'], elapsed_ms)
+        self.mark_used()
+        return kind
+
+    def stats(self) -> Dict[str, Any]:
+        """Cold/warm call counts and latencies for status endpoints"""
+        with self._lock:
+            latency = {
+                kind: {
+                    'calls': values['calls'],
+                    'avg_ms': round(values['total_ms'] / values['calls'], 1) if values['calls'] else None,
+                    'max_ms': round(values['max_ms'], 1)
+                }
+                for kind, values in self._latency.items()
+            }
+        idle = self.idle_seconds()
+        return {
+            'warm': self.is_warm(),
+            'idle_seconds': round(idle, 1) if idle is not None else None,
+            'keep_alive_seconds': self.keep_alive_seconds,
+            'warmups': self.warmups,
+            'last_warmup_ms': self.last_warmup_ms,
+            'latency': latency
+        }
+
+
+class JsonObjectScanner:
+    """Incremental brace scanner that spots the first complete JSON object.
+
+    Tokens are fed as they stream in; string literals and escapes are
+    tracked so braces inside values do not confuse the depth count.
+    """
+
+    def __init__(self):
+        self._text = ''
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> Optional[str]:
+        """Consume more text; return the first valid JSON object string once complete"""
+        self._text += text
+        while self._pos < len(self._text):
+            char = self._text[self._pos]
+            self._pos += 1
+
+            if self._start == -1:
+                if char == '{':
+                    self._start = self._pos - 1
+                    self._depth = 1
+            elif self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == '{':
+                self._depth += 1
+            elif char == '}':
+                self._depth -= 1
+                if self._depth == 0:
+                    candidate = self._text[self._start:self._pos]
+                    self._start = -1
+                    try:
+                        if isinstance(json.loads(candidate), dict):
+                            return candidate
+                    except ValueError:
+                        pass
+        return None
@@ -0,0 +1,112 @@
+# pagination.py - Keyset (cursor) pagination with opaque page tokens
+import base64
+from typing import Dict, Any, List, Optional, Tuple
+
+from bson import json_util
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Named sort orders; each ends in _id so every position is unique
+ORDERS = {
+    '_id': [('_id', 1)],
+    'rating': [('rating', -1), ('_id', -1)],
+    'year': [('year', 1), ('_id', 1)],
+}
+
+
+def page_size(first: Optional[int]) -> int:
+    """Clamp a requested page size to 1..MAX_PAGE_SIZE"""
+    if not first:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(first), MAX_PAGE_SIZE))
+
+
+def encode_cursor(order: str, document: Dict[str, Any]) -> str:
+    """Opaque token for the position of document in the given order"""
+    values = [document.get(field) for field, _ in ORDERS[order]]
+    payload = json_util.dumps({'o': order, 'v': values})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(order: str, token: str) -> List[Any]:
+    """Sort-key values from a token; ValueError if it is malformed or from another order"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        values = payload['v']
+        valid = payload['o'] == order and len(values) == len(ORDERS[order])
+    except Exception:
+        valid = False
+    if not valid:
+        raise ValueError('Invalid page cursor')
+    return values
+
+
+def keyset_filter(order: str, values: List[Any]) -> Dict[str, Any]:
+    """Filter matching only documents that sort after the given sort-key values.
+
+    Missing/null fields sort first ascending and last descending, so they
+    get their own branches rather than being skipped by $gt/$lt.
+    """
+    branches = []
+    fields = ORDERS[order]
+    for i, (field, direction) in enumerate(fields):
+        equal = {previous: value for (previous, _), value in zip(fields[:i], values[:i])}
+        value = values[i]
+        if value is None:
+            if direction == -1:
+                continue
+            branches.append({**equal, field: {'$ne': None}})
+            continue
+        branches.append({**equal, field: {'$gt' if direction == 1 else '$lt': value}})
+        if direction == -1 and field != '_id':
+            branches.append({**equal, field: None})
+    return {'$or': branches}
+
+
+def paginate(collection, query_filter: Dict[str, Any], order: str = '_id', first: Optional[int] = None,
+             after: Optional[str] = None, projection: Optional[Dict[str, int]] = None,
+             collation: Optional[Dict[str, Any]] = None,
+             cursor_field: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Fetch one page after the cursor; returns (documents, next page token or None).
+
+    The range condition seeks straight to the page in the sort index, so page
+    100 costs the same as page 1 (unlike skip). When cursor_field is given,
+    each document also gets its own cursor under that key.
+    """
+    if order not in ORDERS:
+        raise ValueError(f"Unknown sort order: {order}")
+    limit = page_size(first)
+
+    if after:
+        seek = keyset_filter(order, decode_cursor(order, after))
+        query_filter = {'$and': [query_filter, seek]} if query_filter else seek
+
+    # Sort keys must come back to build cursors; drop the ones not asked for afterwards
+    hidden = []
+    if projection is not None:
+        projection = dict(projection)
+        inclusive = any(value for key, value in projection.items() if key != '_id')
+        for field, _ in ORDERS[order]:
+            if field == '_id' and not projection.get('_id', 1):
+                projection['_id'] = 1
+                hidden.append(field)
+            elif field != '_id' and inclusive and not projection.get(field):
+                projection[field] = 1
+                hidden.append(field)
+
+    cursor = collection.find(query_filter, projection, collation=collation)
+    documents = list(cursor.sort(ORDERS[order]).limit(limit + 1))
+
+    has_more = len(documents) > limit
+    documents = documents[:limit]
+    next_token = encode_cursor(order, documents[-1]) if has_more else None
+
+    for document in documents:
+        if cursor_field:
+            document[cursor_field] = encode_cursor(order, document)
+        for field in hidden:
+            document.pop(field, None)
+
+    return documents, next_token
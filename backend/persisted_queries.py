@@ -0,0 +1,135 @@
+# persisted_queries.py - Automatic persisted queries (APQ) for /graphql
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from document_cache import document_key
+
+PERSISTED_QUERY_NOT_FOUND = 'PersistedQueryNotFound'
+PERSISTED_QUERY_HASH_MISMATCH = 'provided sha does not match query'
+
+
+class PersistedQueryStore:
+    """sha256 -> query text for documents that have already passed validation.
+
+    Clients send only the hash; on a miss they retry once with the full text,
+    which is validated and registered. Memory is an LRU; an optional SQLite
+    file keeps registrations across restarts and is consulted on memory misses.
+    """
+
+    def __init__(self, document_cache, max_entries: int = 1000, disk_path: Optional[str] = None):
+        self.document_cache = document_cache
+        self.max_entries = max_entries
+        self._queries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        self._disk_path = disk_path
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.registered = 0
+        self.rejected = 0
+
+        if disk_path:
+            self._open_disk(disk_path)
+
+    def _open_disk(self, path: str):
+        """Open (or create) the on-disk store"""
+        try:
+            self._disk = sqlite3.connect(path, check_same_thread=False)
+            self._disk.execute(
+                'CREATE TABLE IF NOT EXISTS persisted_queries ('
+                'hash TEXT PRIMARY KEY, query TEXT NOT NULL)'
+            )
+            self._disk.commit()
+            print(f"✅ Persisted query store: {path}")
+        except sqlite3.Error as e:
+            print(f"⚠️  Persisted query disk store unavailable: {e}")
+            self._disk = None
+
+    def get(self, sha256_hash: str) -> Optional[str]:
+        """Query text registered under the hash, or None"""
+        with self._lock:
+            query = self._queries.get(sha256_hash)
+            if query is not None:
+                self._queries.move_to_end(sha256_hash)
+                self.hits += 1
+                return query
+
+            query = self._disk_get(sha256_hash)
+            if query is not None:
+                self.disk_hits += 1
+                self._store(sha256_hash, query)
+                return query
+
+            self.misses += 1
+            return None
+
+    def register(self, query: str, sha256_hash: Optional[str] = None) -> bool:
+        """Store query if it validates; ValueError if it does not match the client's hash"""
+        key = document_key(query)
+        if sha256_hash is not None and sha256_hash.lower() != key:
+            with self._lock:
+                self.rejected += 1
+            raise ValueError(PERSISTED_QUERY_HASH_MISMATCH)
+
+        # Only valid documents are persisted (this also warms the document cache)
+        _, errors = self.document_cache.get(query)
+        if errors:
+            with self._lock:
+                self.rejected += 1
+            return False
+
+        with self._lock:
+            if key not in self._queries:
+                self.registered += 1
+            self._store(key, query)
+            self._disk_put(key, query)
+        return True
+
+    def _store(self, key: str, query: str):
+        self._queries[key] = query
+        self._queries.move_to_end(key)
+        while len(self._queries) > self.max_entries:
+            self._queries.popitem(last=False)
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        if self._disk is None:
+            return None
+        try:
+            row = self._disk.execute(
+                'SELECT query FROM persisted_queries WHERE hash = ?', (key,)
+            ).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            print(f"⚠️  Persisted query disk read failed: {e}")
+            return None
+
+    def _disk_put(self, key: str, query: str):
+        if self._disk is None:
+            return
+        try:
+            self._disk.execute(
+                'INSERT OR IGNORE INTO persisted_queries (hash, query) VALUES (?, ?)', (key, query)
+            )
+            self._disk.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️  Persisted query disk write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size for status endpoints"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._queries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'registered': self.registered,
+                'rejected': self.rejected,
+                'hit_rate': round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+                'disk_path': self._disk_path if self._disk is not None else None
+            }
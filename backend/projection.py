@@ -0,0 +1,58 @@
+# projection.py - MongoDB projections derived from the GraphQL selection set
+from typing import Dict, Iterable, Optional, Set
+
+from graphene.utils.str_converters import to_snake_case
+from graphql.language import FieldNode, FragmentSpreadNode, InlineFragmentNode
+
+
+def selected_fields(info) -> Set[str]:
+    """Snake-cased fields selected directly under the resolved field, fragments included"""
+    fields = set()
+    visited_fragments = set()
+
+    def collect(selection_set):
+        if selection_set is None:
+            return
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                name = selection.name.value
+                if not name.startswith('__'):
+                    fields.add(to_snake_case(name))
+            elif isinstance(selection, InlineFragmentNode):
+                collect(selection.selection_set)
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment_name = selection.name.value
+                if fragment_name in visited_fragments:
+                    continue
+                visited_fragments.add(fragment_name)
+                fragment = info.fragments.get(fragment_name)
+                if fragment is not None:
+                    collect(fragment.selection_set)
+
+    for field_node in info.field_nodes:
+        collect(field_node.selection_set)
+    return fields
+
+
+def build_projection(info, field_map: Dict[str, Iterable[str]],
+                     always: Iterable[str] = ()) -> Optional[Dict[str, int]]:
+    """Projection containing only the document fields the query asked for.
+
+    field_map maps GraphQL fields to the document fields they read; fields
+    not in the map (computed ones) add nothing. Returns None when no
+    selection info is available so callers fall back to their default.
+    """
+    if info is None or not getattr(info, 'field_nodes', None):
+        return None
+
+    projection = {'_id': 0}
+    for field in always:
+        projection[field] = 1
+    for field in selected_fields(info):
+        for document_field in field_map.get(field, ()):
+            projection[document_field] = 1
+
+    # {'_id': 0} alone would mean "everything but _id"
+    if len(projection) == 1:
+        return {'_id': 1}
+    return projection
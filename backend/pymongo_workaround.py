@@ -1,7 +1,8 @@
 # pymongo_workaround.py - Bypass MongoEngine with direct PyMongo
-import os
-import pymongo
 from dotenv import load_dotenv
+from mongo_connection import get_client, get_database
+from filter_compiler import CASE_INSENSITIVE
+from pagination import paginate
 
 load_dotenv()
 
@@ -9,101 +10,173 @@ class PyMongoMovieService:
     """Direct PyMongo service to bypass MongoEngine issues"""
     
     def __init__(self):
-        self.client = pymongo.MongoClient(os.getenv('MONGODB_URI'))
-        self.db = self.client.imdb
+        self.client = get_client()
+        self.db = get_database()
         self.movies_collection = self.db.movies
         self.genres_collection = self.db.genres
     
-    def get_all_movies(self, limit=20):
-        """Get all movies"""
+    def _find_page(self, query_filter, order, projection, limit, after, collation=None):
+        """One keyset page of movies; each document carries its own 'cursor'"""
+        docs, _ = paginate(
+            self.movies_collection, query_filter, order,
+            first=limit, after=after, projection=projection,
+            collation=collation, cursor_field='cursor'
+        )
+        
+        movies = []
+        for doc in docs:
+            # Remove _id field to avoid GraphQL errors
+            doc.pop('_id', None)
+            # Add backward compatibility
+            doc['genre'] = doc.get('genres', [])
+            movies.append(doc)
+        
+        return movies
+    
+    def get_all_movies(self, limit=20, projection=None, after=None):
+        """Get all movies in _id order (projection defaults to the summary fields)"""
         try:
-            cursor = self.movies_collection.find({}, {
+            return self._find_page({}, '_id', projection or {
                 'title': 1, 'year': 1, 'rating': 1, 
                 'genres': 1, 'directors': 1, 'runtime': 1
-            }).limit(limit)
-            
-            movies = []
-            for doc in cursor:
-                # Remove _id field to avoid GraphQL errors
-                doc.pop('_id', None)
-                # Add backward compatibility
-                doc['genre'] = doc.get('genres', [])
-                movies.append(doc)
-            
-            return movies
+            }, limit, after)
+        except ValueError:
+            raise
         except Exception as e:
             print(f"Error getting all movies: {e}")
             return []
     
-    def get_movies_by_genre(self, genre):
-        """Get movies by genre"""
+    def get_movies_by_genre(self, genre, projection=None, limit=20, after=None):
+        """Get top-rated movies by genre (case-insensitive, served by the collated genres/rating index)"""
         try:
-            cursor = self.movies_collection.find(
-                {'genres': {'$regex': genre, '$options': 'i'}},
-                {
+            return self._find_page(
+                {'genres': genre.strip()},
+                'rating',
+                projection or {
                     'title': 1, 'year': 1, 'rating': 1,
                     'genres': 1, 'directors': 1, 'runtime': 1
-                }
-            ).limit(20)
-            
-            movies = []
-            for doc in cursor:
-                # Remove _id field to avoid GraphQL errors
-                doc.pop('_id', None)
-                doc['genre'] = doc.get('genres', [])
-                movies.append(doc)
-            
-            return movies
+                },
+                limit, after,
+                collation=CASE_INSENSITIVE
+            )
+        except ValueError:
+            raise
         except Exception as e:
             print(f"Error getting movies by genre: {e}")
             return []
     
-    def get_movies_by_year(self, year):
+    def get_movie_by_title(self, title, projection=None):
+        """Get the movie with this title, ignoring case (served by the collated title index)"""
+        try:
+            movie = self.movies_collection.find_one(
+                {'title': title.strip()},
+                projection or {
+                    'title': 1, 'year': 1, 'rating': 1,
+                    'genres': 1, 'directors': 1, 'runtime': 1
+                },
+                collation=CASE_INSENSITIVE
+            )
+        except Exception as e:
+            print(f"Error getting movie by title: {e}")
+            return None
+        if movie is None:
+            return None
+        # Same shape as the page helpers: no _id, plus the backward-compatible 'genre'
+        movie.pop('_id', None)
+        movie['genre'] = movie.get('genres', [])
+        return movie
+    
+    def get_movies_by_year(self, year, projection=None, limit=20, after=None):
         """Get movies by year"""
         try:
-            cursor = self.movies_collection.find(
+            return self._find_page(
                 {'year': year},
-                {
+                'year',
+                projection or {
                     'title': 1, 'year': 1, 'rating': 1,
                     'genres': 1, 'directors': 1
-                }
-            ).limit(20)
-            
-            movies = []
-            for doc in cursor:
-                # Remove _id field to avoid GraphQL errors
-                doc.pop('_id', None)
-                doc['genre'] = doc.get('genres', [])
-                movies.append(doc)
-            
-            return movies
+                },
+                limit, after
+            )
+        except ValueError:
+            raise
         except Exception as e:
             print(f"Error getting movies by year: {e}")
             return []
     
-    def get_movies_by_rating(self, min_rating):
-        """Get movies by minimum rating"""
+    def get_movies_by_rating(self, min_rating, projection=None, limit=20, after=None):
+        """Get movies by minimum rating, highest first"""
         try:
-            cursor = self.movies_collection.find(
+            return self._find_page(
                 {'rating': {'$gte': min_rating}},
-                {
+                'rating',
+                projection or {
                     'title': 1, 'year': 1, 'rating': 1,
                     'genres': 1, 'directors': 1
-                }
-            ).sort('rating', -1).limit(20)
-            
-            movies = []
-            for doc in cursor:
-                # Remove _id field to avoid GraphQL errors
-                doc.pop('_id', None)
-                doc['genre'] = doc.get('genres', [])
-                movies.append(doc)
-            
-            return movies
+                },
+                limit, after
+            )
+        except ValueError:
+            raise
         except Exception as e:
             print(f"Error getting movies by rating: {e}")
             return []
     
+    def get_genres_by_names(self, names):
+        """Genre documents for several names in one query: {name: genre}"""
+        try:
+            cursor = self.genres_collection.find({'name': {'$in': list(names)}}, {'_id': 0})
+            return {genre['name']: genre for genre in cursor}
+        except Exception as e:
+            print(f"Error getting genres: {e}")
+            return {}
+    
+    def get_all_genres(self, limit=None):
+        """Genre documents by name (the first `limit` of them when given)"""
+        try:
+            cursor = self.genres_collection.find({}, {'_id': 0}).sort('name', 1)
+            return list(cursor.limit(limit) if limit else cursor)
+        except Exception as e:
+            print(f"Error getting genres: {e}")
+            return []
+    
+    def get_movies_grouped_by(self, field, values, limit=20, projection=None):
+        """Top-rated movies for each of several genres/directors in one query: {value: [movies]}"""
+        groups = {value: [] for value in values}
+        projection = dict(projection or {
+            'title': 1, 'year': 1, 'rating': 1,
+            'genres': 1, 'directors': 1
+        })
+        
+        # The grouping field must come back even if the query didn't ask for it
+        hide_field = any(value for key, value in projection.items() if key != '_id') and not projection.get(field)
+        if hide_field:
+            projection[field] = 1
+        
+        try:
+            cursor = self.movies_collection.find({field: {'$in': list(groups)}}, projection)
+            open_groups = len(groups)
+            for doc in cursor.sort([('rating', -1), ('_id', -1)]):
+                doc.pop('_id', None)
+                for value in doc.get(field) or []:
+                    group = groups.get(value)
+                    if group is not None and len(group) < limit:
+                        group.append(doc)
+                        if len(group) == limit:
+                            open_groups -= 1
+                # Stop reading once every group is full
+                if open_groups == 0:
+                    break
+        except Exception as e:
+            print(f"Error getting movies by {field}: {e}")
+        
+        for group in groups.values():
+            for doc in group:
+                doc['genre'] = doc.get('genres', [])
+                if hide_field:
+                    doc.pop(field, None)
+        return groups
+    
     def count_movies(self):
         """Count total movies"""
         try:
@@ -0,0 +1,193 @@
+# query_cache.py - Normalized-query cache for LLM parse results
+import copy
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+# Articles and politeness only: anything else ('like', 'will', 'any') can carry
+# meaning, and dropping it would let two different queries share a parse
+STOP_WORDS = frozenset(['a', 'an', 'the', 'please', 'kindly'])
+
+# Bumped whenever normalize_query changes, so older disk-tier keys never match
+KEY_VERSION = 2
+
+_PUNCTUATION = re.compile(r"[^\w\s.<>=-]")
+_NON_DECIMAL_DOT = re.compile(r"(?<!\d)\.|\.(?!\d)")
+
+
+def normalize_query(text: str) -> str:
+    """Normalize case, whitespace, punctuation and stop-words of a NL query"""
+    text = _NON_DECIMAL_DOT.sub(' ', text.lower())
+    text = _PUNCTUATION.sub(' ', text)
+    tokens = [token for token in text.split()
+              if token.strip('-') and token not in STOP_WORDS]
+    return ' '.join(tokens)
+
+
+class ParseCache:
+    """Thread-safe LRU + TTL cache of validated parsed_query dicts.
+
+    An optional SQLite file acts as a second tier so hot phrasings survive
+    restarts; memory misses fall through to disk and are promoted on hit.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600,
+                 disk_path: Optional[str] = None, max_disk_entries: int = 10000):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()  # key -> (expires_at, parsed_query)
+        self._lock = threading.Lock()
+        self._disk = None
+        self._disk_path = disk_path
+        self._puts_since_prune = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if disk_path:
+            self._open_disk(disk_path)
+
+    def _open_disk(self, path: str):
+        """Open (or create) the on-disk tier"""
+        try:
+            self._disk = sqlite3.connect(path, check_same_thread=False)
+            self._disk.execute(
+                'CREATE TABLE IF NOT EXISTS parse_cache ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'expires_at REAL NOT NULL, last_access REAL NOT NULL)'
+            )
+            self._disk.execute(
+                'CREATE INDEX IF NOT EXISTS parse_cache_last_access '
+                'ON parse_cache (last_access)'
+            )
+            self._disk.commit()
+            print(f"✅ Parse cache disk tier: {path}")
+        except sqlite3.Error as e:
+            print(f"⚠️  Parse cache disk tier unavailable: {e}")
+            self._disk = None
+
+    @staticmethod
+    def make_key(user_input: str, model_name: str, prompt_version: str) -> str:
+        """Build a cache key from the normalized input, model and prompt version"""
+        return f"v{KEY_VERSION}|{model_name}|{prompt_version}|{normalize_query(user_input)}"
+
+    def get(self, key: str, count_miss: bool = True) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached parsed_query, or None on miss/expiry.
+
+        count_miss=False is for a re-check of a key whose miss was already counted.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(value)
+                del self._entries[key]
+                self.expirations += 1
+
+            value = self._disk_get(key, now)
+            if value is not None:
+                self.disk_hits += 1
+                self._store(key, value, now + self.ttl_seconds)
+                return copy.deepcopy(value)
+
+            if count_miss:
+                self.misses += 1
+            return None
+
+    def put(self, key: str, parsed_query: Dict[str, Any]):
+        """Cache a validated parsed_query"""
+        value = copy.deepcopy(parsed_query)
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._store(key, value, expires_at)
+            self._disk_put(key, value, expires_at)
+
+    def _store(self, key: str, value: Dict[str, Any], expires_at: float):
+        """Insert into the memory tier, evicting least recently used entries"""
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_get(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        if self._disk is None:
+            return None
+        try:
+            row = self._disk.execute(
+                'SELECT value FROM parse_cache WHERE key = ? AND expires_at > ?',
+                (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._disk.execute(
+                'UPDATE parse_cache SET last_access = ? WHERE key = ?', (now, key)
+            )
+            self._disk.commit()
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            print(f"⚠️  Parse cache disk read failed: {e}")
+            return None
+
+    def _disk_put(self, key: str, value: Dict[str, Any], expires_at: float):
+        if self._disk is None:
+            return
+        try:
+            self._disk.execute(
+                'INSERT OR REPLACE INTO parse_cache (key, value, expires_at, last_access) '
+                'VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value), expires_at, time.time())
+            )
+            self._puts_since_prune += 1
+            if self._puts_since_prune >= 100:
+                self._prune_disk()
+            self._disk.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"⚠️  Parse cache disk write failed: {e}")
+
+    def _prune_disk(self):
+        """Drop expired rows and keep the disk tier under max_disk_entries"""
+        self._puts_since_prune = 0
+        self._disk.execute('DELETE FROM parse_cache WHERE expires_at <= ?', (time.time(),))
+        self._disk.execute(
+            'DELETE FROM parse_cache WHERE key NOT IN ('
+            'SELECT key FROM parse_cache ORDER BY last_access DESC LIMIT ?)',
+            (self.max_disk_entries,)
+        )
+
+    def clear(self):
+        """Drop every cached entry from both tiers"""
+        with self._lock:
+            self._entries.clear()
+            if self._disk is not None:
+                self._disk.execute('DELETE FROM parse_cache')
+                self._disk.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and sizes for status endpoints"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+                'disk_path': self._disk_path if self._disk is not None else None
+            }
@@ -0,0 +1,138 @@
+# query_cost.py - Static cost, depth and alias limits for GraphQL documents
+import os
+from typing import Dict, Any, Optional, Type
+
+from graphql import (
+    DocumentNode, FieldNode, FragmentDefinitionNode, FragmentSpreadNode, GraphQLError,
+    GraphQLSchema, InlineFragmentNode, IntValueNode, OperationDefinitionNode,
+    VariableNode, get_named_type, is_composite_type, is_list_type
+)
+from graphql.type.definition import get_nullable_type
+from graphql.validation import ValidationRule
+
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+# Assumed length of lists that take no `first` argument (genreDetails, directorDetails);
+# every root list takes one, so this only bounds the per-movie lists
+DEFAULT_LIST_SIZE = int(os.getenv('GRAPHQL_DEFAULT_LIST_SIZE', '10'))
+
+PAGE_SIZE_ARGUMENTS = ('first', 'limit')
+
+
+def _list_size(field_node: FieldNode, field_def, variable_defaults: Dict[str, Any]) -> int:
+    """Worst-case length of a list field: its page-size argument, else a default"""
+    for argument in field_node.arguments or ():
+        if argument.name.value not in PAGE_SIZE_ARGUMENTS:
+            continue
+        value = argument.value
+        if isinstance(value, IntValueNode):
+            return max(1, min(int(value.value), MAX_PAGE_SIZE))
+        if isinstance(value, VariableNode):
+            # Validation can't see variable values - assume the largest page unless defaulted
+            default = variable_defaults.get(value.name.value)
+            return max(1, min(default, MAX_PAGE_SIZE)) if default else MAX_PAGE_SIZE
+    if any(name in field_def.args for name in PAGE_SIZE_ARGUMENTS):
+        return DEFAULT_PAGE_SIZE
+    return DEFAULT_LIST_SIZE
+
+
+def analyze_document(schema: GraphQLSchema, document: DocumentNode) -> Dict[str, Any]:
+    """Cost, depth and alias count of the most expensive operation in document.
+
+    Every object the query can return costs 1 and list fields multiply the
+    cost of their selection by their (worst-case) length, so nesting and
+    aliasing multiply just as they would multiply Mongo work.
+    """
+    fragments = {
+        definition.name.value: definition for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    worst = {'cost': 0, 'depth': 0, 'aliases': 0}
+
+    for definition in document.definitions:
+        if not isinstance(definition, OperationDefinitionNode):
+            continue
+        root_type = schema.get_root_type(definition.operation)
+        if root_type is None:
+            continue
+        variable_defaults = {
+            variable.variable.name.value: int(variable.default_value.value)
+            for variable in definition.variable_definitions or ()
+            if isinstance(variable.default_value, IntValueNode)
+        }
+        totals = {'aliases': 0}
+
+        def measure(selection_set, parent_type, depth, visited):
+            """(cost, max depth) of a selection set on parent_type"""
+            cost, max_depth = 0, depth
+            for selection in selection_set.selections:
+                if isinstance(selection, FieldNode):
+                    if selection.alias is not None:
+                        totals['aliases'] += 1
+                    field_def = parent_type.fields.get(selection.name.value) if hasattr(parent_type, 'fields') else None
+                    if field_def is None or selection.selection_set is None:
+                        continue
+                    field_type = get_named_type(field_def.type)
+                    if not is_composite_type(field_type):
+                        continue
+                    size = _list_size(selection, field_def, variable_defaults) \
+                        if is_list_type(get_nullable_type(field_def.type)) else 1
+                    child_cost, child_depth = measure(selection.selection_set, field_type, depth + 1, visited)
+                    cost += size * (1 + child_cost)
+                    max_depth = max(max_depth, child_depth)
+                elif isinstance(selection, InlineFragmentNode):
+                    fragment_type = schema.get_type(selection.type_condition.name.value) \
+                        if selection.type_condition else parent_type
+                    child_cost, child_depth = measure(selection.selection_set, fragment_type or parent_type, depth, visited)
+                    cost += child_cost
+                    max_depth = max(max_depth, child_depth)
+                elif isinstance(selection, FragmentSpreadNode):
+                    name = selection.name.value
+                    fragment = fragments.get(name)
+                    # Cycles are reported by the standard NoFragmentCycles rule
+                    if fragment is None or name in visited:
+                        continue
+                    fragment_type = schema.get_type(fragment.type_condition.name.value) or parent_type
+                    child_cost, child_depth = measure(fragment.selection_set, fragment_type, depth, visited | {name})
+                    cost += child_cost
+                    max_depth = max(max_depth, child_depth)
+            return cost, max_depth
+
+        cost, depth = measure(definition.selection_set, root_type, 0, frozenset())
+        worst = {
+            'cost': max(worst['cost'], cost),
+            'depth': max(worst['depth'], depth),
+            'aliases': max(worst['aliases'], totals['aliases'])
+        }
+
+    return worst
+
+
+def cost_extensions(schema: GraphQLSchema, document: DocumentNode) -> Dict[str, Any]:
+    """Response extensions reporting the document's cost analysis"""
+    return {'cost': analyze_document(schema, document)}
+
+
+def query_cost_rule(max_cost: Optional[int] = None, max_depth: Optional[int] = None,
+                    max_aliases: Optional[int] = None) -> Type[ValidationRule]:
+    """Validation rule rejecting documents over the cost/depth/alias budget (env defaults)"""
+    limits = {
+        'cost': max_cost if max_cost is not None else int(os.getenv('GRAPHQL_MAX_COST', '1000')),
+        'depth': max_depth if max_depth is not None else int(os.getenv('GRAPHQL_MAX_DEPTH', '6')),
+        'aliases': max_aliases if max_aliases is not None else int(os.getenv('GRAPHQL_MAX_ALIASES', '15'))
+    }
+
+    class QueryCostRule(ValidationRule):
+        LIMITS = limits
+
+        def enter_document(self, node, *_args):
+            analysis = analyze_document(self.context.schema, node)
+            for measure, limit in self.LIMITS.items():
+                if limit and analysis[measure] > limit:
+                    self.report_error(GraphQLError(
+                        f"Query {measure} {analysis[measure]} exceeds the maximum of {limit}.",
+                        node
+                    ))
+            return self.SKIP
+
+    return QueryCostRule
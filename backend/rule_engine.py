@@ -0,0 +1,193 @@
+# rule_engine.py - Precompiled single-pass rule engine for the fallback parser
+import re
+from typing import Dict, Any, List, Tuple
+
+GENRE_WORDS = [
+    'action', 'comedy', 'drama', 'thriller', 'horror', 'sci-fi', 'romance', 'fantasy',
+    'adventure', 'crime', 'documentary', 'animation', 'biography', 'history', 'mystery',
+    'war', 'western', 'musical', 'sport'
+]
+NUMBER = r'\d+\.?\d*'
+NUMBER_TRIGGER = '#number'
+
+# Slot families with their alternatives in priority order:
+# (label, trigger words, pattern anchored at the trigger with an optional 'value' group).
+# Trigger words are the literals a match can start with; each pattern keeps the
+# legacy leading \b (or lack of one), so 'starring' still starts 'star' and the
+# 'action' in 'action-packed' is still a genre.
+SLOT_RULES: List[Tuple[str, List[Tuple[str, List[str], str]]]] = [
+    ('operation', [
+        ('DELETE', ['delete', 'remove', 'drop', 'eliminate', 'destroy'],
+         r'\b(?:delete|remove|drop|eliminate|destroy)\b'),
+        ('CREATE', ['add', 'create', 'insert', 'new', 'make'],
+         r'\b(?:add|create|insert|new|make)\b'),
+        ('UPDATE', ['update', 'modify', 'change', 'edit', 'set', 'alter'],
+         r'\b(?:update|modify|change|edit|set|alter)\b'),
+        ('COUNT', ['count', 'how', 'number'],
+         r'\b(?:count|how many|number of)\b'),
+        ('AGGREGATE', ['average', 'mean', 'sum', 'total', 'max', 'min', 'highest', 'lowest'],
+         r'\b(?:average|mean|sum|total|max|min|highest|lowest)\b'),
+    ]),
+    ('entity', [
+        ('MOVIE', ['movie', 'movies', 'film', 'films'], r'\b(?:movie|movies|film|films)'),
+        ('GENRE', ['genre', 'genres', 'category', 'categories'], r'\b(?:genre|genres|category|categories)'),
+        ('DIRECTOR', ['director', 'directors'], r'\b(?:director|directors)'),
+        ('ACTOR', ['actor', 'actors', 'star', 'stars'], r'\b(?:actor|actors|star|stars)'),
+    ]),
+    ('genre', [
+        ('genre', GENRE_WORDS, rf"\b(?P<value>{'|'.join(GENRE_WORDS)})\b"),
+    ]),
+    ('year', [
+        ('year', [NUMBER_TRIGGER], r'\b(?P<value>(?:19|20)\d{2})\b'),
+    ]),
+    ('rating', [
+        ('above', ['rating'], rf'rating\s*(?:is\s+)?(?:above|over|greater\s+than|>|>=)\s*(?P<value>{NUMBER})'),
+        ('below', ['rating'], rf'rating\s*(?:is\s+)?(?:below|under|less\s+than|<|<=)\s*(?P<value>{NUMBER})'),
+        ('exact', ['with'], rf'with\s+rating\s+(?P<value>{NUMBER})'),
+        ('exact', ['rating'], rf'rating\s+(?:is\s+|equals?\s+|=\s*)?(?P<value>{NUMBER})'),
+        ('exact', ['rated'], rf'rated\s+(?P<value>{NUMBER})'),
+        ('exact', [NUMBER_TRIGGER], rf'(?<!\S)(?P<value>{NUMBER})\s+rating'),
+        ('exact', ['rating'], rf'rating:\s*(?P<value>{NUMBER})'),
+    ]),
+    ('title', [
+        ('title', ['called', 'named', 'titled', 'with'],
+         r'(?:called|named|titled|with name)\s+["\'](?P<value>[^"\']+)["\']'),
+        ('title', ['called', 'named', 'titled', 'with'],
+         r'(?:called|named|titled|with name)\s+(?P<value>[A-Za-z0-9\s]+?)(?:\s|$)'),
+        ('title', ['movie'], r'movie\s+["\'](?P<value>[^"\']+)["\']'),
+        ('title', ['film'], r'film\s+["\'](?P<value>[^"\']+)["\']'),
+    ]),
+    ('director', [
+        ('director', ['directed', 'director'],
+         r'(?:directed\s+by|director\s*:?)\s+(?P<value>[A-Za-z\s]+?)(?:\s|$)'),
+    ]),
+    ('actor', [
+        ('actor', ['starring', 'actor', 'star', 'stars'],
+         r'(?:starring|actor\s*:?|stars?)\s+(?P<value>[A-Za-z\s]+?)(?:\s|$)'),
+    ]),
+]
+
+
+def _build_triggers() -> Dict[str, List[Tuple[str, int, str, Any, bool]]]:
+    """Compile every alternative once and index it by the words that can start it"""
+    triggers = {}
+    for slot, alternatives in SLOT_RULES:
+        for priority, (label, words, pattern) in enumerate(alternatives):
+            compiled = re.compile(pattern, re.IGNORECASE)
+            has_value = 'value' in compiled.groupindex
+            for word in words:
+                triggers.setdefault(word, []).append((slot, priority, label, compiled, has_value))
+    return triggers
+
+
+def _trie_alternation(words) -> str:
+    """Regex alternation of words with shared prefixes factored out (longest match first)"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def emit(node):
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return '(?:' + body + ')?' if '' in node else body
+
+    return emit(trie)
+
+
+def _build_trigger_pattern(words) -> 're.Pattern':
+    """One pattern finding every position where a trigger word (or a run of digits) starts.
+
+    The lookahead keeps matches zero-width, so trigger words inside longer
+    words and overlapping ones ('moviestars') are all found. At each position
+    the longest word wins; the shorter triggers there are its prefixes.
+    """
+    return re.compile(rf'(?=({_trie_alternation(words)}))|(?<!\d)(?=\d)', re.IGNORECASE)
+
+
+def _build_prefix_rules(triggers) -> Dict[str, List[Tuple[str, int, str, Any, bool]]]:
+    """Rules of every trigger word that is a prefix of each trigger word (itself included)"""
+    prefix_rules = {NUMBER_TRIGGER: triggers.get(NUMBER_TRIGGER, [])}
+    for word in triggers:
+        if word != NUMBER_TRIGGER:
+            prefix_rules[word] = [
+                rule for other in triggers if other != NUMBER_TRIGGER and word.startswith(other)
+                for rule in triggers[other]
+            ]
+    return prefix_rules
+
+
+class RuleEngine:
+    """Single-pass scanner emitting operation, entity and filter slots.
+
+    One precompiled pattern finds every position a rule can start at; only
+    the rules of the trigger word found there (and of its prefixes) are
+    matched, anchored at that position. Within a slot the highest-priority
+    alternative wins and ties go to the leftmost match, reproducing the old
+    one-re.search-per-pattern behaviour.
+    """
+
+    TRIGGERS = _build_triggers()
+    TRIGGER_PATTERN = _build_trigger_pattern([word for word in TRIGGERS if word != NUMBER_TRIGGER])
+    PREFIX_RULES = _build_prefix_rules(TRIGGERS)
+
+    @classmethod
+    def scan(cls, text: str) -> Dict[str, Any]:
+        """Scan text once and return operation, entity, filters and matched operation keywords"""
+        best = {}
+        operation_keywords = set()
+        prefix_rules = cls.PREFIX_RULES
+
+        for trigger in cls.TRIGGER_PATTERN.finditer(text):
+            word = trigger.group(1)
+            rules = prefix_rules[NUMBER_TRIGGER if word is None else word.lower()]
+            position = trigger.start()
+            for slot, priority, label, pattern, has_value in rules:
+                current = best.get(slot)
+                if current is not None and current[0] <= priority and slot != 'operation':
+                    continue
+                match = pattern.match(text, position)
+                if match is None:
+                    continue
+                if slot == 'operation':
+                    operation_keywords.add(label)
+                if current is None or priority < current[0]:
+                    best[slot] = (priority, label, match.group('value') if has_value else None)
+
+        return {
+            'operation': best['operation'][1] if 'operation' in best else 'READ',
+            'entity': best['entity'][1] if 'entity' in best else 'MOVIE',
+            'filters': cls._filters_from_slots(best),
+            'operation_keywords': sorted(operation_keywords)
+        }
+
+    @staticmethod
+    def _filters_from_slots(best: Dict[str, Tuple[int, str, Any]]) -> Dict[str, Any]:
+        """Convert the winning slot matches into the parser's filter dict"""
+        filters = {}
+
+        if 'genre' in best:
+            filters['genre'] = best['genre'][2].title()
+
+        if 'year' in best:
+            filters['year'] = int(best['year'][2])
+
+        if 'rating' in best:
+            _, label, value = best['rating']
+            if label == 'exact':
+                filters['rating'] = float(value)
+            else:
+                filters['rating'] = {
+                    'operator': label,
+                    'value': float(value)
+                }
+
+        for slot in ['title', 'director', 'actor']:
+            if slot in best:
+                filters[slot] = best[slot][2].strip()
+
+        return filters
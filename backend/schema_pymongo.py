@@ -1,9 +1,23 @@
 # schema_pymongo.py - Complete GraphQL schema using PyMongo directly
+import threading
 import graphene
 from pymongo_workaround import PyMongoMovieService
+from projection import build_projection
+from pagination import page_size
+from dataloader import request_loaders, share_batch, siblings
 
-# Initialize PyMongo service
-movie_service = PyMongoMovieService()
+# PyMongo service, created on first use rather than at import
+_movie_service = None
+_movie_service_lock = threading.Lock()
+
+def get_movie_service():
+    """Shared PyMongoMovieService instance"""
+    global _movie_service
+    if _movie_service is None:
+        with _movie_service_lock:
+            if _movie_service is None:
+                _movie_service = PyMongoMovieService()
+    return _movie_service
 
 class MovieType(graphene.ObjectType):
     """GraphQL Movie type using PyMongo data"""
@@ -13,53 +27,169 @@ class MovieType(graphene.ObjectType):
     genres = graphene.List(graphene.String)
     directors = graphene.List(graphene.String)
     runtime = graphene.Int()
+    description = graphene.String()
+    actors = graphene.List(graphene.String)
+    
+    # Opaque keyset cursor; pass it as `after` to fetch the next page
+    cursor = graphene.String()
+    
+    # Related objects, batch-loaded once per nesting level (see dataloader.py)
+    genre_details = graphene.List(lambda: GenreType)
+    director_details = graphene.List(lambda: DirectorType)
     
     # Backward compatibility
     genre = graphene.List(graphene.String)
     
+    # GraphQL field -> document fields it reads, used to build projections
+    FIELD_MAP = {
+        'title': ['title'],
+        'year': ['year'],
+        'rating': ['rating'],
+        'genres': ['genres'],
+        'directors': ['directors'],
+        'runtime': ['runtime'],
+        'description': ['description'],
+        'actors': ['actors'],
+        'genre': ['genres'],
+        'cursor': [],
+        'genre_details': ['genres'],
+        'director_details': ['directors']
+    }
+    
     @classmethod
     def from_dict(cls, movie_dict):
         """Create MovieType from dictionary, filtering out unwanted fields"""
         # Remove any fields that aren't part of our GraphQL type
         filtered_dict = {
             key: value for key, value in movie_dict.items() 
-            if key in ['title', 'year', 'rating', 'genres', 'directors', 'runtime', 'genre']
+            if key in cls.FIELD_MAP
         }
         return cls(**filtered_dict)
     
+    @classmethod
+    def projection(cls, info):
+        """MongoDB projection for just the Movie fields selected in this query"""
+        return build_projection(info, cls.FIELD_MAP)
+    
     def resolve_genre(self, info):
         """Backward compatibility"""
         return getattr(self, 'genres', []) or []
+    
+    def resolve_genre_details(self, info):
+        """Genre documents of this movie, fetched with those of every sibling movie"""
+        loader = request_loaders(info).get('genre', _load_genres)
+        loader.queue(name for movie in siblings(self) for name in (movie.genres or []))
+        return [genre for genre in loader.load_many(self.genres or []) if genre is not None]
+    
+    def resolve_director_details(self, info):
+        """Directors of this movie"""
+        loader = request_loaders(info).get('director', _load_directors)
+        loader.queue(name for movie in siblings(self) for name in (movie.directors or []))
+        return loader.load_many(self.directors or [])
+
+class GenreType(graphene.ObjectType):
+    """GraphQL Genre type from the genres collection"""
+    name = graphene.String()
+    description = graphene.String()
+    movie_count = graphene.Int()
+    movies = graphene.List(MovieType, first=graphene.Int())
+    
+    @classmethod
+    def from_dict(cls, genre_dict):
+        return cls(
+            name=genre_dict.get('name'),
+            description=genre_dict.get('description'),
+            movie_count=genre_dict.get('movie_count')
+        )
+    
+    def resolve_movies(self, info, first=None):
+        """Top-rated movies in this genre, fetched with those of every sibling genre"""
+        loader = _movies_loader(info, 'genres', page_size(first))
+        loader.queue(genre.name for genre in siblings(self))
+        return loader.load(self.name, [])
+
+class DirectorType(graphene.ObjectType):
+    """A director, identified by name"""
+    name = graphene.String()
+    movies = graphene.List(MovieType, first=graphene.Int())
+    
+    def resolve_movies(self, info, first=None):
+        """Top-rated movies by this director, fetched with those of every sibling director"""
+        loader = _movies_loader(info, 'directors', page_size(first))
+        loader.queue(director.name for director in siblings(self))
+        return loader.load(self.name, [])
+
+def _load_genres(names):
+    """Batch function: GenreType per name (genres missing from the collection get just a name)"""
+    found = get_movie_service().get_genres_by_names(names)
+    genres = {name: GenreType.from_dict(found.get(name, {'name': name})) for name in names}
+    share_batch(list(genres.values()))
+    return genres
+
+def _load_directors(names):
+    """Batch function: DirectorType per name (no query needed)"""
+    directors = {name: DirectorType(name=name) for name in names}
+    share_batch(list(directors.values()))
+    return directors
+
+def _movies_loader(info, field, limit):
+    """Loader of the top `limit` movies per genre/director value, with this field's projection"""
+    projection = MovieType.projection(info)
+    name = ('movies_by', field, limit, tuple(sorted(projection.items())) if projection else None)
+    
+    def load_movies(values):
+        groups = get_movie_service().get_movies_grouped_by(field, values, limit, projection)
+        movies = {value: [MovieType.from_dict(doc) for doc in docs] for value, docs in groups.items()}
+        # Every movie of this level shares one batch, so the next level is one query too
+        share_batch([movie for group in movies.values() for movie in group])
+        return movies
+    
+    return request_loaders(info).get(name, load_movies)
 
 class Query(graphene.ObjectType):
     # Movie queries - keeping same names as original for compatibility
-    movies_by_genre = graphene.List(MovieType, genre=graphene.String())
-    movies_by_year = graphene.List(MovieType, year=graphene.Int())
-    movies_by_rating = graphene.List(MovieType, min_rating=graphene.Float())
-    all_movies_list = graphene.List(MovieType)
+    movie_by_title = graphene.Field(MovieType, title=graphene.String())
+    # `first` is the page size, `after` the cursor of the last movie already seen
+    movies_by_genre = graphene.List(MovieType, genre=graphene.String(), first=graphene.Int(), after=graphene.String())
+    movies_by_year = graphene.List(MovieType, year=graphene.Int(), first=graphene.Int(), after=graphene.String())
+    movies_by_rating = graphene.List(MovieType, min_rating=graphene.Float(), first=graphene.Int(), after=graphene.String())
+    all_movies_list = graphene.List(MovieType, first=graphene.Int(), after=graphene.String())
+    
+    # Genre queries - bounded like the movie lists so query cost can count them
+    all_genres_list = graphene.List(GenreType, first=graphene.Int())
     
     # Connection-style queries for backward compatibility
     all_movies = graphene.Field(graphene.String)  # Placeholder - not implemented
     
-    def resolve_movies_by_genre(self, info, genre):
+    def resolve_movie_by_title(self, info, title):
+        """Resolve a single movie by title (case-insensitive) using PyMongo"""
+        movie = get_movie_service().get_movie_by_title(title, MovieType.projection(info))
+        return MovieType.from_dict(movie) if movie else None
+    
+    def resolve_movies_by_genre(self, info, genre, first=None, after=None):
         """Resolve movies by genre using PyMongo"""
-        movies_data = movie_service.get_movies_by_genre(genre)
-        return [MovieType.from_dict(movie) for movie in movies_data]
+        movies_data = get_movie_service().get_movies_by_genre(genre, MovieType.projection(info), page_size(first), after)
+        return share_batch([MovieType.from_dict(movie) for movie in movies_data])
     
-    def resolve_movies_by_year(self, info, year):
+    def resolve_movies_by_year(self, info, year, first=None, after=None):
         """Resolve movies by year using PyMongo"""
-        movies_data = movie_service.get_movies_by_year(year)
-        return [MovieType.from_dict(movie) for movie in movies_data]
+        movies_data = get_movie_service().get_movies_by_year(year, MovieType.projection(info), page_size(first), after)
+        return share_batch([MovieType.from_dict(movie) for movie in movies_data])
     
-    def resolve_movies_by_rating(self, info, min_rating):
+    def resolve_movies_by_rating(self, info, min_rating, first=None, after=None):
         """Resolve movies by rating using PyMongo"""
-        movies_data = movie_service.get_movies_by_rating(min_rating)
-        return [MovieType.from_dict(movie) for movie in movies_data]
+        movies_data = get_movie_service().get_movies_by_rating(min_rating, MovieType.projection(info), page_size(first), after)
+        return share_batch([MovieType.from_dict(movie) for movie in movies_data])
     
-    def resolve_all_movies_list(self, info):
+    def resolve_all_movies_list(self, info, first=None, after=None):
         """Resolve all movies using PyMongo"""
-        movies_data = movie_service.get_all_movies()
-        return [MovieType.from_dict(movie) for movie in movies_data]
+        movies_data = get_movie_service().get_all_movies(page_size(first), MovieType.projection(info), after)
+        return share_batch([MovieType.from_dict(movie) for movie in movies_data])
+    
+    def resolve_all_genres_list(self, info, first=None):
+        """Resolve genres (first page_size(first) by name) using PyMongo"""
+        genres = get_movie_service().get_all_genres(page_size(first))
+        return share_batch([GenreType.from_dict(genre) for genre in genres])
     
     def resolve_all_movies(self, info):
         """Placeholder for connection-style queries"""
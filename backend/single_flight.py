@@ -0,0 +1,77 @@
+# single_flight.py - Coalesce concurrent identical calls into one
+import copy
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """While a call for a key is running, callers asking for the same key wait
+    for it and share its result instead of starting their own."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.timed_out = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any],
+           timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """Run fn once per key at a time; returns (result, shared).
+
+        Followers get a deep copy so they can mutate it freely; exceptions
+        raised by fn are re-raised in every caller. A follower still waiting
+        after timeout seconds raises TimeoutError (the leader keeps running).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+
+        if not leader:
+            if not call.done.wait(timeout):
+                with self._lock:
+                    self.timed_out += 1
+                raise TimeoutError(f"single-flight call for {key!r} still running after {timeout}s")
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result), True
+
+        try:
+            result = fn()
+            # Keep a private copy for followers; the leader may mutate its result
+            call.result = copy.deepcopy(result)
+            return result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, Any]:
+        """Leader/follower counters for status endpoints"""
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'leaders': self.leaders,
+                'coalesced': self.coalesced,
+                'timed_out': self.timed_out
+            }
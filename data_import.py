@@ -1,11 +1,14 @@
 # data_import.py - Import IMDB CSV data to MongoDB Atlas
 import pandas as pd
-import pymongo
-from pymongo import MongoClient
 import os
+import sys
 from dotenv import load_dotenv
 import json
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from index_manager import ensure_indexes
+from mongo_connection import get_client, get_database
+
 load_dotenv()
 
 def clean_and_prepare_data(df):
@@ -16,19 +19,19 @@ def clean_and_prepare_data(df):
     # Clean column names
     df.columns = df.columns.str.lower().str.replace(' ', '_').str.replace('(', '').str.replace(')', '').str.replace('-', '_')
     
-    # Handle the specific IMDB columns
+    # Handle the specific IMDB columns - target names follow models.Movie
     column_mapping = {
         'rank': 'rank',
         'title': 'title',
-        'genre': 'genre',
+        'genre': 'genres',
         'description': 'description',
         'director': 'directors',
         'actors': 'actors',
         'year': 'year',
-        'runtime_minutes': 'runtime_minutes',
+        'runtime_minutes': 'runtime',
         'rating': 'rating',
         'votes': 'votes',
-        'revenue_millions': 'revenue_millions'
+        'revenue_millions': 'revenue'
     }
     
     # Rename columns to match our model
@@ -40,8 +43,8 @@ def clean_and_prepare_data(df):
     if 'year' in df.columns:
         df['year'] = pd.to_numeric(df['year'], errors='coerce').astype('Int64')
     
-    if 'runtime_minutes' in df.columns:
-        df['runtime_minutes'] = pd.to_numeric(df['runtime_minutes'], errors='coerce').astype('Int64')
+    if 'runtime' in df.columns:
+        df['runtime'] = pd.to_numeric(df['runtime'], errors='coerce').astype('Int64')
     
     if 'rating' in df.columns:
         df['rating'] = pd.to_numeric(df['rating'], errors='coerce')
@@ -49,11 +52,11 @@ def clean_and_prepare_data(df):
     if 'votes' in df.columns:
         df['votes'] = pd.to_numeric(df['votes'], errors='coerce').astype('Int64')
     
-    if 'revenue_millions' in df.columns:
-        df['revenue_millions'] = pd.to_numeric(df['revenue_millions'], errors='coerce')
+    if 'revenue' in df.columns:
+        df['revenue'] = pd.to_numeric(df['revenue'], errors='coerce')
     
     # Process array fields (split by comma)
-    array_fields = ['genre', 'directors', 'actors']
+    array_fields = ['genres', 'directors', 'actors']
     for field in array_fields:
         if field in df.columns:
             df[field] = df[field].apply(lambda x: [item.strip() for item in str(x).split(',')] if pd.notna(x) and str(x) != 'nan' else [])
@@ -81,9 +84,9 @@ def import_imdb_data(csv_file_path='IMDB-Movie-Data.csv'):
     
     try:
         print("🔗 Connecting to MongoDB Atlas...")
-        client = MongoClient(mongodb_uri)
+        client = get_client(mongodb_uri)
         client.admin.command('ping')
-        db = client.imdb
+        db = get_database()
         print("✅ Connected to MongoDB Atlas")
         
         # Read CSV file
@@ -127,15 +130,6 @@ def import_imdb_data(csv_file_path='IMDB-Movie-Data.csv'):
         
         print(f"✅ Imported {len(movies_data)} movies")
         
-        # Create indexes for better performance
-        print("🔍 Creating database indexes...")
-        movies_collection.create_index([("title", 1)])
-        movies_collection.create_index([("year", 1)])
-        movies_collection.create_index([("rating", 1)])
-        movies_collection.create_index([("genre", 1)])
-        movies_collection.create_index([("directors", 1)])
-        print("✅ Created database indexes")
-        
         # Generate genres collection
         print("🏷️  Generating genres collection...")
         genres_collection = db.genres
@@ -146,8 +140,8 @@ def import_imdb_data(csv_file_path='IMDB-Movie-Data.csv'):
         # Extract unique genres
         all_genres = set()
         for movie in movies_data:
-            if movie.get('genre'):
-                all_genres.update(movie['genre'])
+            if movie.get('genres'):
+                all_genres.update(movie['genres'])
         
         # Create genre documents with movie counts
         genres_data = []
@@ -155,7 +149,7 @@ def import_imdb_data(csv_file_path='IMDB-Movie-Data.csv'):
             if genre and genre.strip():  # Skip empty genres
                 genre_name = genre.strip()
                 movie_count = sum(1 for movie in movies_data 
-                                if movie.get('genre') and genre_name in movie['genre'])
+                                if movie.get('genres') and genre_name in movie['genres'])
                 genres_data.append({
                     'name': genre_name,
                     'description': f'Movies in the {genre_name} genre',
@@ -166,8 +160,10 @@ def import_imdb_data(csv_file_path='IMDB-Movie-Data.csv'):
             genres_collection.insert_many(genres_data)
             print(f"✅ Created {len(genres_data)} genres")
         
-        # Create index for genres
-        genres_collection.create_index([("name", 1)])
+        # Create the indexes the query layer relies on (see backend/index_manager.py)
+        print("🔍 Creating database indexes...")
+        ensure_indexes(db, fix_conflicts=True)
+        print("✅ Created database indexes")
         
         # Print summary
         print("\n📊 Import Summary:")
@@ -192,71 +188,71 @@ def create_sample_data():
     
     try:
         print("🔗 Connecting to MongoDB Atlas...")
-        client = MongoClient(mongodb_uri)
+        client = get_client(mongodb_uri)
         client.admin.command('ping')
-        db = client.imdb
+        db = get_database()
         
         # Sample movies data
         sample_movies = [
             {
                 'title': 'Inception',
-                'genre': ['Action', 'Sci-Fi', 'Thriller'],
+                'genres': ['Action', 'Sci-Fi', 'Thriller'],
                 'description': 'A thief who steals corporate secrets through dream-sharing technology.',
                 'directors': ['Christopher Nolan'],
                 'actors': ['Leonardo DiCaprio', 'Marion Cotillard', 'Ellen Page'],
                 'year': 2010,
-                'runtime_minutes': 148,
+                'runtime': 148,
                 'rating': 8.8,
                 'votes': 2000000,
-                'revenue_millions': 829.9
+                'revenue': 829.9
             },
             {
                 'title': 'The Dark Knight',
-                'genre': ['Action', 'Crime', 'Drama'],
+                'genres': ['Action', 'Crime', 'Drama'],
                 'description': 'Batman faces the Joker in this epic superhero film.',
                 'directors': ['Christopher Nolan'],
                 'actors': ['Christian Bale', 'Heath Ledger', 'Aaron Eckhart'],
                 'year': 2008,
-                'runtime_minutes': 152,
+                'runtime': 152,
                 'rating': 9.0,
                 'votes': 2500000,
-                'revenue_millions': 1004.9
+                'revenue': 1004.9
             },
             {
                 'title': 'Interstellar',
-                'genre': ['Adventure', 'Drama', 'Sci-Fi'],
+                'genres': ['Adventure', 'Drama', 'Sci-Fi'],
                 'description': 'A team of explorers travel through a wormhole in space.',
                 'directors': ['Christopher Nolan'],
                 'actors': ['Matthew McConaughey', 'Anne Hathaway', 'Jessica Chastain'],
                 'year': 2014,
-                'runtime_minutes': 169,
+                'runtime': 169,
                 'rating': 8.6,
                 'votes': 1800000,
-                'revenue_millions': 677.5
+                'revenue': 677.5
             },
             {
                 'title': 'The Avengers',
-                'genre': ['Action', 'Adventure', 'Sci-Fi'],
+                'genres': ['Action', 'Adventure', 'Sci-Fi'],
                 'description': 'Earth\'s mightiest heroes must come together to stop an alien invasion.',
                 'directors': ['Joss Whedon'],
                 'actors': ['Robert Downey Jr.', 'Chris Evans', 'Scarlett Johansson'],
                 'year': 2012,
-                'runtime_minutes': 143,
+                'runtime': 143,
                 'rating': 8.0,
                 'votes': 1300000,
-                'revenue_millions': 1518.8
+                'revenue': 1518.8
             },
             {
                 'title': 'Pulp Fiction',
-                'genre': ['Crime', 'Drama'],
+                'genres': ['Crime', 'Drama'],
                 'description': 'The lives of two mob hitmen, a boxer, and others intertwine.',
                 'directors': ['Quentin Tarantino'],
                 'actors': ['John Travolta', 'Uma Thurman', 'Samuel L. Jackson'],
                 'year': 1994,
-                'runtime_minutes': 154,
+                'runtime': 154,
                 'rating': 8.9,
                 'votes': 1900000,
-                'revenue_millions': 214.2
+                'revenue': 214.2
             }
         ]
         
@@ -280,11 +276,7 @@ def create_sample_data():
         genres_collection.insert_many(genres_data)
         
         # Create indexes
-        movies_collection.create_index([("title", 1)])
-        movies_collection.create_index([("year", 1)])
-        movies_collection.create_index([("rating", 1)])
-        movies_collection.create_index([("genre", 1)])
-        genres_collection.create_index([("name", 1)])
+        ensure_indexes(db, fix_conflicts=True)
         
         print(f"✅ Created sample data: {len(sample_movies)} movies, {len(genres_data)} genres")
         return True
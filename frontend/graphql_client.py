@@ -1,10 +1,23 @@
+import hashlib
 import requests
 import json
 from typing import Dict, Any
 
+PERSISTED_QUERY_NOT_FOUND = 'PersistedQueryNotFound'
+
 class GraphQLClient:
-    def __init__(self, endpoint: str):
+    def __init__(self, endpoint: str, persisted_queries: bool = True):
         self.endpoint = endpoint
+        # Send a sha256 hash first and the full query only when the server doesn't know it
+        self.persisted_queries = persisted_queries
+    
+    def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = requests.post(
+            self.endpoint,
+            json=payload,
+            headers={'Content-Type': 'application/json'}
+        )
+        return response.json()
     
     def execute_query(self, query: str, variables: Dict = None) -> Dict[str, Any]:
         """Execute a GraphQL query"""
@@ -14,12 +27,20 @@ class GraphQLClient:
         }
         
         try:
-            response = requests.post(
-                self.endpoint,
-                json=payload,
-                headers={'Content-Type': 'application/json'}
-            )
-            return response.json()
+            if not self.persisted_queries:
+                return self._post(payload)
+            
+            payload['extensions'] = {
+                'persistedQuery': {
+                    'version': 1,
+                    'sha256Hash': hashlib.sha256(query.encode('utf-8')).hexdigest()
+                }
+            }
+            result = self._post({key: value for key, value in payload.items() if key != 'query'})
+            if PERSISTED_QUERY_NOT_FOUND in (result.get('errors') or []):
+                # First time the server sees this query - send the text so it gets registered
+                result = self._post(payload)
+            return result
         except Exception as e:
             return {'errors': [str(e)]}
     